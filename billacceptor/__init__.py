@@ -0,0 +1,3 @@
+"""Runtime bill acceptor: layanan transaksi, pemantau token, simulator dan benchmark."""
+
+__version__ = "0.1.0"
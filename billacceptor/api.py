@@ -0,0 +1,38 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import config
+
+# Thread yang memakai session bersamaan: loop transaksi, loop antrian, preload, pemantau token dan kirim status
+SESSION_THREADS = 5
+
+# Satu pool koneksi HTTP untuk semua subcommand dalam satu proses; koneksi hanya dibuka saat dibutuhkan
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_THREADS)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+RequestException = requests.exceptions.RequestException
+
+
+def get_tokens(timeout=1):
+    """GET daftar payment token untuk perangkat ini."""
+    return session.get(config.TOKEN_API, timeout=timeout)
+
+
+def get_invoice(payment_token, timeout=5):
+    """GET detail invoice berdasarkan paymentToken."""
+    return session.get(f"{config.INVOICE_API}{payment_token}", timeout=timeout)
+
+
+def get_invoices(timeout=5):
+    return session.get(config.INVOICE_API, timeout=timeout)
+
+
+def post_status(id_trx, payment_token, amount, timeout=5):
+    """POST hasil transaksi ke API bill acceptor."""
+    return session.post(config.BILL_API, json={
+        "ID": id_trx,
+        "paymentToken": payment_token,
+        "productPrice": amount
+    }, timeout=timeout)
@@ -0,0 +1,384 @@
+import collections
+import http.server
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import api, config, tracing
+
+# Skrip lama (sebelum paket) dan penggantinya dalam satu proses
+LEGACY_SCRIPTS = ("billacceptor.py", "billacceptore.py", "billacceptorv.py")
+LEGACY_API_BASE = "https://api-dev.xpdisi.id"
+LEGACY_LOG_DIR = '"/var/www/html/logs"'
+
+
+class _StubApiHandler(http.server.BaseHTTPRequestHandler):
+    """API palsu lokal: tidak ada token, invoice selalu sudah dibayar."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/invoice/device/"):
+            self._reply({"data": []})
+        else:
+            self._reply({"data": {"ID": 0, "paymentToken": self.path.rsplit("/", 1)[-1], "productPrice": "0", "isPaid": True}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._reply({"message": "ok"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubPigpioHandler(socketserver.BaseRequestHandler):
+    """Daemon pigpio palsu: membalas setiap perintah socket dengan status 0."""
+
+    def _recv_exact(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def handle(self):
+        while True:
+            header = self._recv_exact(16)
+            if header is None:
+                return
+            cmd, p1, p2, p3 = struct.unpack("IIII", header)
+            if p3 and self._recv_exact(p3) is None:
+                return
+            self.request.sendall(struct.pack("IIII", cmd, p1, p2, 0))
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _read_rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _count_fds(pid):
+    fds = sockets = 0
+    for fd in os.listdir(f"/proc/{pid}/fd"):
+        fds += 1
+        try:
+            if os.readlink(f"/proc/{pid}/fd/{fd}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            pass
+    return fds, sockets
+
+
+def _prepare_legacy_script(source, target, api_base, log_dir, port):
+    """Menyalin skrip lama dengan URL API, direktori log dan port Flask diarahkan ke lingkungan benchmark."""
+    with open(source) as f:
+        script = f.read()
+    script = script.replace(LEGACY_API_BASE, api_base)
+    script = script.replace(LEGACY_LOG_DIR, repr(log_dir))
+    script = script.replace("port=5000", f"port={port}")
+    with open(target, "w") as f:
+        f.write(script)
+
+
+def _measure_group(commands, env, api_server, warmup, duration):
+    """Menjalankan satu kelompok proses, lalu mengambil sampel /proc setelah semuanya terhubung."""
+    with api_server.stats_lock:
+        api_server.stats.update(connections=0, requests=0)
+    procs = [
+        subprocess.Popen(command, env=env, stdin=subprocess.DEVNULL,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for command in commands
+    ]
+    samples = []
+    try:
+        time.sleep(warmup)
+        with api_server.stats_lock:
+            start_stats = dict(api_server.stats)
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            exited = [command for command, proc in zip(commands, procs) if proc.poll() is not None]
+            if exited:
+                raise RuntimeError(f"Proses berhenti saat benchmark: {' '.join(exited[0])}")
+            rss = fds = sockets = 0
+            for proc in procs:
+                rss += _read_rss_kb(proc.pid)
+                proc_fds, proc_sockets = _count_fds(proc.pid)
+                fds += proc_fds
+                sockets += proc_sockets
+            samples.append((rss, fds, sockets))
+            time.sleep(0.5)
+        with api_server.stats_lock:
+            end_stats = dict(api_server.stats)
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    minutes = duration / 60
+    return {
+        "processes": len(procs),
+        "rss_kb": max(sample[0] for sample in samples),
+        "fds": round(sum(sample[1] for sample in samples) / len(samples), 1),
+        "sockets": round(sum(sample[2] for sample in samples) / len(samples), 1),
+        "api_connections_per_minute": round((end_stats["connections"] - start_stats["connections"]) / minutes, 1),
+        "api_requests_per_minute": round((end_stats["requests"] - start_stats["requests"]) / minutes, 1),
+    }
+
+
+def bench_footprint(legacy_dir, warmup=5, duration=10):
+    """Membandingkan tiga skrip lama dengan `billacceptor run --watch-tokens` terhadap API dan pigpio palsu lokal."""
+    if not os.path.isdir("/proc/self"):
+        print("⚠ Benchmark footprint membutuhkan /proc (Linux)")
+        return None
+    if not legacy_dir:
+        print("⚠ Benchmark footprint dilewati: gunakan --legacy-dir <checkout skrip lama>")
+        return None
+    missing = [name for name in LEGACY_SCRIPTS if not os.path.isfile(os.path.join(legacy_dir, name))]
+    if missing:
+        print(f"⚠ Skrip lama tidak ditemukan di {legacy_dir}: {', '.join(missing)}")
+        return None
+
+    api_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubApiHandler)
+    api_server.daemon_threads = True
+    api_server.stats = {"connections": 0, "requests": 0}
+    api_server.stats_lock = threading.Lock()
+    pigpio_server = _ThreadingTCPServer(("127.0.0.1", 0), _StubPigpioHandler)
+    servers = (api_server, pigpio_server)
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    api_base = f"http://127.0.0.1:{api_server.server_address[1]}"
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env.update({
+        "PIGPIO_ADDR": "127.0.0.1",
+        "PIGPIO_PORT": str(pigpio_server.server_address[1]),
+        "BILLACCEPTOR_API": api_base,
+        "PYTHONPATH": os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")])),
+    })
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            log_dir = os.path.join(workdir, "logs")
+            os.makedirs(log_dir)
+            legacy_commands = []
+            for name in LEGACY_SCRIPTS:
+                target = os.path.join(workdir, name)
+                _prepare_legacy_script(os.path.join(legacy_dir, name), target, api_base, log_dir, _free_port())
+                legacy_commands.append([sys.executable, target])
+            unified_command = [
+                sys.executable, "-m", "billacceptor", "--log-dir", log_dir,
+                "run", "--watch-tokens", "--host", "127.0.0.1", "--port", str(_free_port()),
+            ]
+            results["legacy"] = _measure_group(legacy_commands, env, api_server, warmup, duration)
+            results["unified"] = _measure_group([unified_command], env, api_server, warmup, duration)
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    for label, total in results.items():
+        print(f"{label:8s} proses: {total['processes']}  RSS: {total['rss_kb'] / 1024:.1f} MiB  "
+              f"fd: {total['fds']}  socket: {total['sockets']}  "
+              f"koneksi API/menit: {total['api_connections_per_minute']}  request API/menit: {total['api_requests_per_minute']}")
+    saved = results["legacy"]["rss_kb"] - results["unified"]["rss_kb"]
+    print(f"Penghematan RSS: {saved / 1024:.1f} MiB")
+    return results
+
+
+def bench_tracing():
+    """Overhead tracing saat dimatikan; False jika melebihi batas."""
+    result = tracing.bench()
+    if result["disabled_span"] - result["baseline"] > tracing.MAX_DISABLED_OVERHEAD_NS:
+        print("⚠ Overhead tracing saat dimatikan terlalu besar!")
+        return False
+    return True
+
+
+class _StubResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+class _StubDeviceApi:
+    """Pengganti modul api untuk benchmark idle: tidak ada token, setiap panggilan dihitung."""
+
+    RequestException = api.RequestException
+
+    def __init__(self):
+        self.calls = collections.Counter()
+
+    def get_tokens(self, timeout=1):
+        self.calls["get_tokens"] += 1
+        return _StubResponse({"data": []})
+
+    def get_invoice(self, token, timeout=5):
+        self.calls["get_invoice"] += 1
+        return _StubResponse({"data": {"ID": 0, "paymentToken": token, "productPrice": "0", "isPaid": True}})
+
+    def get_invoices(self):
+        self.calls["get_invoices"] += 1
+        return _StubResponse({"data": []})
+
+    def post_status(self, id_trx, payment_token, amount):
+        self.calls["post_status"] += 1
+        return _StubResponse({"message": "ok"})
+
+
+class _StubPi:
+    connected = True
+
+    def write(self, gpio, level):
+        pass
+
+    def callback(self, gpio, edge, func):
+        pass
+
+
+def _idle_child(low_power, log_dir):
+    """Proses anak benchmark idle: loop device asli dengan api dan pigpio palsu."""
+    from . import device, watch
+
+    report_out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    sys.stdout = open(os.devnull, "w")
+
+    config.LOW_POWER = low_power
+    config.VERBOSE = not low_power
+    config.set_log_dir(log_dir)
+    stub_api = _StubDeviceApi()
+    device.api = watch.api = stub_api
+    device.pi = _StubPi()
+    device.ensure_log_dir()
+
+    server = device.create_server("127.0.0.1", 0)
+    device.start_threads(watch_tokens=True)
+    threading.Thread(target=device.serve, args=("127.0.0.1", 0, server), daemon=True).start()
+
+    report_out.write("ready\n")
+    report_out.flush()
+    # Blok sampai induk selesai mengukur; baca stdin tidak menimbulkan wakeup
+    sys.stdin.readline()
+    report_out.write(json.dumps({"monitor": device.idle_monitor.report(), "api_calls": dict(stub_api.calls)}) + "\n")
+    report_out.flush()
+
+
+def _read_process_counters(pid):
+    """Total context switch sukarela (semua thread) dan waktu CPU proses dari /proc."""
+    switches = 0
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/status") as f:
+                for line in f:
+                    if line.startswith("voluntary_ctxt_switches:"):
+                        switches += int(line.split()[1])
+        except OSError:
+            pass
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    return switches, cpu
+
+
+def _measure_idle(low_power, warmup, duration):
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory() as log_dir:
+        proc = subprocess.Popen(
+            [sys.executable, "-c", "import sys; from billacceptor import bench; bench._idle_child(sys.argv[1] == '1', sys.argv[2])",
+             "1" if low_power else "0", log_dir],
+            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            if proc.stdout.readline().strip() != "ready":
+                raise RuntimeError("Proses benchmark idle gagal dimulai")
+            time.sleep(warmup)
+            switches_start, cpu_start = _read_process_counters(proc.pid)
+            time.sleep(duration)
+            switches_end, cpu_end = _read_process_counters(proc.pid)
+            proc.stdin.write("\n")
+            proc.stdin.flush()
+            child = json.loads(proc.stdout.readline())
+        finally:
+            proc.kill()
+            proc.wait()
+
+    minutes = duration / 60
+    return {
+        "wakeups_per_minute": round((switches_end - switches_start) / minutes, 2),
+        "cpu_seconds_per_idle_hour": round((cpu_end - cpu_start) / (duration / 3600), 3),
+        "api_calls_per_hour": round(sum(child["api_calls"].values()) / ((warmup + duration) / 3600)),
+        "monitor": child["monitor"],
+    }
+
+
+def bench_idle(duration=30, warmup=2):
+    """Membandingkan wakeup dan waktu CPU saat idle: loop device asli mode biasa vs mode hemat daya.
+
+    Setiap mode berjalan di proses terpisah (trigger_transaction, invoice_queue_loop, pemantau token
+    dan server HTTP asli, dengan api dan pigpio palsu). Wakeup diukur dari context switch sukarela
+    seluruh thread di /proc, jadi termasuk server HTTP dan loop yang tidak memakai IdleMonitor.
+    """
+    if not os.path.isdir("/proc/self"):
+        print("⚠ Benchmark idle membutuhkan /proc (Linux)")
+        return None
+
+    results = {
+        "default": _measure_idle(False, warmup, duration),
+        "low_power": _measure_idle(True, warmup, duration),
+    }
+    for label, result in results.items():
+        print(f"{label:9s} wakeup/menit: {result['wakeups_per_minute']:7.2f}  "
+              f"request API/jam: {result['api_calls_per_hour']:5d}  CPU/jam idle: {result['cpu_seconds_per_idle_hour']:.3f} s  "
+              f"IdleMonitor: {result['monitor']['wakeups_per_minute']} wakeup/menit")
+    return results
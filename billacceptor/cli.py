@@ -0,0 +1,101 @@
+import argparse
+import sys
+
+from . import config
+
+
+def cmd_run(args):
+    from . import device
+
+    config.TRACING_ENABLED = args.tracing or config.TRACING_ENABLED
+    config.AUTO_CALIBRATE = args.auto_calibrate or config.AUTO_CALIBRATE
+    config.LOW_POWER = args.low_power or config.LOW_POWER
+    if config.LOW_POWER:
+        config.VERBOSE = args.verbose
+    return device.run(host=args.host, port=args.port, watch_tokens=args.watch_tokens)
+
+
+def cmd_watch_tokens(args):
+    from . import watch
+
+    try:
+        watch.main_loop(interval=args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_simulate(args):
+    from . import simulate
+
+    for seed in args.seeds:
+        result = simulate.simulate(
+            hours=args.hours,
+            seed=seed,
+            burst_interval=args.burst_interval,
+            max_burst=args.max_burst,
+            abandon_rate=args.abandon_rate,
+        )
+        print(f"Seed {seed}: {result['customers']} pelanggan")
+        for policy in ("legacy", "queue"):
+            print(f"  {policy:7s} {result[policy]}")
+        print(f"  Peningkatan transaksi/jam: {result['improvement']}%")
+        print(f"  Perubahan rata-rata waktu tunggu: {result['wait_change']:+} detik")
+    return 0
+
+
+def cmd_bench(args):
+    from . import bench
+
+    ok = True
+    if args.target in ("tracing", "all"):
+        ok = bench.bench_tracing() and ok
+    if args.target in ("footprint", "all"):
+        bench.bench_footprint(args.legacy_dir, duration=args.duration)
+    if args.target in ("idle", "all"):
+        bench.bench_idle(duration=args.duration)
+    return 0 if ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="billacceptor", description="Runtime bill acceptor")
+    parser.add_argument("--device", default=config.ID_DEVICE, help="ID perangkat untuk API token (default: %(default)s)")
+    parser.add_argument("--log-dir", default=config.LOG_DIR, help="Direktori log transaksi (default: %(default)s)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Menjalankan layanan bill acceptor")
+    run.add_argument("--host", default="0.0.0.0")
+    run.add_argument("--port", type=int, default=5000)
+    run.add_argument("--tracing", action="store_true", help="Aktifkan tracing sejak awal")
+    run.add_argument("--auto-calibrate", action="store_true", help="Terapkan kalibrasi pulsa otomatis")
+    run.add_argument("--watch-tokens", action="store_true", help="Jalankan juga pemantau token di proses yang sama (dilewati di mode hemat daya tanpa --verbose)")
+    run.add_argument("--low-power", action="store_true", help="Mode hemat daya: tunggu event, tanpa output konsol")
+    run.add_argument("--verbose", action="store_true", help="Tetap tampilkan output konsol di mode hemat daya")
+    run.set_defaults(func=cmd_run)
+
+    watch = subparsers.add_parser("watch-tokens", help="Memantau payment token yang valid")
+    watch.add_argument("--interval", type=float, default=1)
+    watch.set_defaults(func=cmd_watch_tokens)
+
+    simulate = subparsers.add_parser("simulate", help="Simulasi antrian invoice dengan kedatangan bergerombol")
+    simulate.add_argument("--hours", type=float, default=8)
+    simulate.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3])
+    simulate.add_argument("--burst-interval", type=float, default=240)
+    simulate.add_argument("--max-burst", type=int, default=4)
+    simulate.add_argument("--abandon-rate", type=float, default=0.1)
+    simulate.set_defaults(func=cmd_simulate)
+
+    bench = subparsers.add_parser("bench", help="Benchmark overhead tracing, footprint proses dan idle")
+    bench.add_argument("target", nargs="?", choices=("tracing", "footprint", "idle", "all"), default="all")
+    bench.add_argument("--duration", type=float, default=30, help="Lama pengukuran dalam detik")
+    bench.add_argument("--legacy-dir", help="Direktori berisi skrip lama (billacceptor.py, billacceptore.py, billacceptorv.py) untuk benchmark footprint")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config.set_device(args.device)
+    config.set_log_dir(args.log_dir)
+    sys.exit(args.func(args))
@@ -0,0 +1,66 @@
+import os
+
+# Konfigurasi PIN GPIO
+BILL_ACCEPTOR_PIN = 14
+EN_PIN = 15
+
+# Konfigurasi perangkat
+ID_DEVICE = os.environ.get("BILLACCEPTOR_DEVICE", "bic01")
+
+# Konfigurasi transaksi
+TIMEOUT = 20
+DEBOUNCE_TIME = 0.05
+TOLERANCE = 2
+SETTLE_TIME = 2
+MAX_RETRY = 0
+TOKEN_MAX_AGE = 180
+
+# Konfigurasi tracing & profiler
+TRACING_ENABLED = False
+
+# Konfigurasi kalibrasi pulsa
+AUTO_CALIBRATE = False
+CALIBRATION_INTERVAL = 300
+
+# Konfigurasi antrian invoice
+QUEUE_POLL_INTERVAL = 5
+
+# Konfigurasi mode hemat daya
+LOW_POWER = False
+IDLE_POLL_INTERVAL = 15
+VERBOSE = True
+
+# Mapping jumlah pulsa ke nominal uang
+PULSE_MAPPING = {
+    1: 1000,
+    2: 2000,
+    5: 5000,
+    10: 10000,
+    20: 20000,
+    50: 50000,
+    100: 100000
+}
+
+# API URL
+API_BASE = os.environ.get("BILLACCEPTOR_API", "https://api-dev.xpdisi.id")
+TOKEN_API = f"{API_BASE}/invoice/device/{ID_DEVICE}"
+INVOICE_API = f"{API_BASE}/invoice/"
+BILL_API = f"{API_BASE}/order/billacceptor"
+
+# Lokasi penyimpanan log transaksi
+LOG_DIR = os.environ.get("BILLACCEPTOR_LOG_DIR", "/var/www/html/logs")
+LOG_FILE = os.path.join(LOG_DIR, "log.txt")
+TRACE_DIR = os.path.join(LOG_DIR, "traces")
+
+
+def set_device(device_id):
+    global ID_DEVICE, TOKEN_API
+    ID_DEVICE = device_id
+    TOKEN_API = f"{API_BASE}/invoice/device/{ID_DEVICE}"
+
+
+def set_log_dir(log_dir):
+    global LOG_DIR, LOG_FILE, TRACE_DIR
+    LOG_DIR = log_dir
+    LOG_FILE = os.path.join(LOG_DIR, "log.txt")
+    TRACE_DIR = os.path.join(LOG_DIR, "traces")
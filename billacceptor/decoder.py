@@ -0,0 +1,29 @@
+from . import config
+
+
+def nearest_valid_pulse(pulses, pulse_mapping=None):
+    """Jumlah pulsa valid terdekat menurut aturan decoder, tanpa batas toleransi."""
+    pulse_mapping = pulse_mapping if pulse_mapping is not None else config.PULSE_MAPPING
+    if pulses == 1:
+        return 1
+    if 2 < pulses < 5:
+        return 2
+    return min(pulse_mapping.keys(), key=lambda x: abs(x - pulses) if x != 1 else float("inf"))
+
+
+def required_tolerance(pulses, pulse_mapping=None):
+    """Toleransi minimal agar closest_valid_pulse menerima jumlah pulsa ini."""
+    if pulses == 1 or 2 < pulses < 5:
+        return 0
+    return abs(pulses - nearest_valid_pulse(pulses, pulse_mapping))
+
+
+def closest_valid_pulse(pulses):
+    """Mendapatkan jumlah pulsa yang paling mendekati nilai yang valid."""
+    if required_tolerance(pulses) > config.TOLERANCE:
+        return None
+    return nearest_valid_pulse(pulses)
+
+
+def pulse_amount(pulses):
+    return config.PULSE_MAPPING.get(pulses, 0)
@@ -0,0 +1,669 @@
+import json
+import os
+import threading
+import time
+
+import pigpio
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+from . import api, config, decoder, idle, invoicequeue, pulsecapture, tokens, tracing
+from .logger import console, ensure_log_dir, log_transaction
+
+# Inisialisasi Flask
+app = Flask(__name__)
+
+
+# Variabel Global
+pi = None
+pulse_count = 0
+pending_pulse_count = 0
+last_pulse_time = time.time()
+transaction_active = False
+total_inserted = 0
+id_trx = None
+payment_token = None
+product_price = 0
+last_pulse_received_time = time.time()
+timeout_thread = None 
+insufficient_payment_count = 0
+trace_id = None
+transaction_span = None
+burst_span = None
+pulse_capture = pulsecapture.PulseCapture(config.PULSE_MAPPING)
+calibration = {}
+invoice_queue = invoicequeue.InvoiceQueue()
+idle_monitor = idle.IdleMonitor()
+token_event = threading.Event()
+pulse_event = threading.Event()
+active_event = threading.Event()
+refresh_event = threading.Event()
+watch_event = threading.Event()
+transaction_lock = threading.Lock()
+
+# Jeda tambahan agar bangun tepat setelah deadline, bukan sebelumnya
+TIMER_SLACK = 0.01
+
+# Interval polling shutdown server HTTP bawaan werkzeug
+SERVER_POLL_INTERVAL = 0.5
+
+# Polling token kosong di bawah durasi ini tidak dicatat sebagai span
+POLL_SPAN_MIN_MS = 250
+
+# Inisialisasi pigpio
+def init_gpio():
+    global pi
+    pi = pigpio.pi()
+    if not pi.connected:
+        log_transaction("⚠ Gagal terhubung ke pigpio daemon!")
+        return False
+
+    pi.set_mode(config.BILL_ACCEPTOR_PIN, pigpio.INPUT)
+    pi.set_pull_up_down(config.BILL_ACCEPTOR_PIN, pigpio.PUD_UP)
+    pi.set_mode(config.EN_PIN, pigpio.OUTPUT)
+    pi.write(config.EN_PIN, 0)
+    return True
+
+# Fungsi GET ke API Invoice
+def fetch_invoice_details():
+    try:
+        response = api.get_invoices()
+        response_data = response.json()
+
+        if response.status_code == 200 and "data" in response_data:
+            for invoice in response_data["data"]:
+                if not invoice.get("isPaid", False):
+                    log_transaction(f"✅ Invoice ditemukan: {invoice['paymentToken']}, belum dibayar.")
+                    return invoice["ID"], invoice["paymentToken"], int(invoice["productPrice"])
+
+        log_transaction("✅ Tidak ada invoice yang belum dibayar.")
+    except api.RequestException as e:
+        log_transaction(f"⚠ Gagal mengambil data invoice: {e}")
+
+    return None, None, None
+
+# Fungsi POST hasil transaksi
+def send_transaction_status():
+    global total_inserted, transaction_active, last_pulse_received_time, insufficient_payment_count
+
+    submit_span = tracing.start_span("transaction.submit", trace_id, transaction_span, total_inserted=total_inserted)
+    try:
+        response = api.post_status(id_trx, payment_token, total_inserted)
+        tracing.end_span(submit_span, status_code=response.status_code)
+
+        if response.status_code == 200:
+            res_data = response.json()
+            log_transaction(f"✅ Pembayaran sukses: {res_data.get('message')}, Waktu: {res_data.get('payment date')}")
+            reset_transaction()
+
+        elif response.status_code == 400:
+            try:
+                res_data = response.json()
+                error_message = res_data.get("error") or res_data.get("message", "Error tidak diketahui")
+            except ValueError:
+                error_message = response.text
+
+            log_transaction(f"⚠ Gagal ({response.status_code}): {error_message}")
+
+            if "Insufficient payment" in error_message:
+                insufficient_payment_count += 1
+                log_transaction(f"🔄 Uang kurang, percobaan {insufficient_payment_count}/{config.MAX_RETRY}")
+
+                if insufficient_payment_count >= config.MAX_RETRY:
+                    log_transaction("🚫 Pembayaran kurang melebihi batas! Transaksi dibatalkan.")
+                    transaction_active = False  # Matikan transaksi
+                    pi.write(config.EN_PIN, 0)  # Bill acceptor dinonaktifkan
+                    reset_transaction()  # Reset hanya jika max retry tercapai
+                else:
+                    log_transaction(f"🔄 Pembayaran kurang, percobaan {insufficient_payment_count}/{config.MAX_RETRY}. Silakan lanjutkan memasukkan uang...")
+                    
+                    # Pastikan transaction_active tetap berjalan
+                    transaction_active = True
+                    pi.write(config.EN_PIN, 1)  # Bill acceptor tetap aktif
+                    
+                    # Pastikan waktu timeout diperbarui agar tidak langsung reset
+                    last_pulse_received_time = time.time()
+
+                    # Jika belum mencapai retry maksimal, timer harus tetap berjalan
+                    threading.Thread(target=start_timeout_timer, daemon=True).start()
+
+            elif "Payment already completed" in error_message:
+                log_transaction("✅ Pembayaran sudah selesai sebelumnya. Reset transaksi.")
+                transaction_active = False
+                pi.write(config.EN_PIN, 0)
+                reset_transaction()
+
+        else:
+            log_transaction(f"⚠ Respon tidak terduga: {response.status_code}")
+
+    except api.RequestException as e:
+        tracing.end_span(submit_span, error=str(e))
+        log_transaction(f"⚠ Gagal mengirim status transaksi: {e}")
+
+
+# Fungsi untuk menghitung pulsa
+def count_pulse(gpio, level, tick):
+    """Menghitung pulsa dari bill acceptor dan mengonversinya ke nominal uang."""
+    global pulse_count, last_pulse_time, total_inserted, last_pulse_received_time, product_price, pending_pulse_count, timeout_thread, burst_span
+
+    if not transaction_active:
+        return
+
+    pulse_capture.rising(tick)
+    current_time = time.time()
+
+    # Pastikan debounce
+    if (current_time - last_pulse_time) > config.DEBOUNCE_TIME:
+        if pending_pulse_count == 0:
+            pi.write(config.EN_PIN, 0)
+            burst_span = tracing.start_span("pulse.burst", trace_id, transaction_span)
+            # Bangunkan timer agar deadline settle dihitung ulang
+            pulse_event.set()
+        pending_pulse_count += 1
+        last_pulse_time = current_time
+        last_pulse_received_time = current_time 
+        console(f"🔢 Pulsa diterima: {pending_pulse_count}")
+        if timeout_thread is None or not timeout_thread.is_alive():
+            timeout_thread = threading.Thread(target=start_timeout_timer, daemon=True)
+            timeout_thread.start()
+
+# Fungsi untuk mengukur lebar pulsa (falling edge)
+def record_pulse_edge(gpio, level, tick):
+    if transaction_active:
+        pulse_capture.falling(tick)
+
+def idle_poll_interval():
+    return config.IDLE_POLL_INTERVAL if config.LOW_POWER else 1
+
+def server_poll_interval():
+    """Server HTTP bangun setiap interval ini hanya untuk memeriksa shutdown, request tetap dilayani segera."""
+    return config.IDLE_POLL_INTERVAL if config.LOW_POWER else SERVER_POLL_INTERVAL
+
+def next_timer_deadline():
+    """Waktu pemeriksaan timer berikutnya: akhir jeda settle atau timeout."""
+    # remaining_time menjadi 0 satu detik sebelum TIMEOUT penuh
+    deadline = last_pulse_received_time + config.TIMEOUT - 1
+    if pending_pulse_count > 0 or total_inserted >= product_price:
+        deadline = min(deadline, last_pulse_received_time + config.SETTLE_TIME)
+    return deadline
+
+# Fungsi untuk menangani timeout & pembayaran sukses
+def start_timeout_timer():
+    global total_inserted, product_price, transaction_active, last_pulse_received_time, id_trx
+
+    with transaction_lock: 
+        while transaction_active:
+            pulse_event.clear()
+            current_time = time.time()
+            remaining_time = max(0, int(config.TIMEOUT - (current_time - last_pulse_received_time))) 
+            if (current_time - last_pulse_received_time) >= config.SETTLE_TIME and pending_pulse_count > 0:
+                    process_final_pulse_count()
+                    continue
+            if (current_time - last_pulse_received_time) >= config.SETTLE_TIME and total_inserted >= product_price:
+                    transaction_active = False
+                    pi.write(config.EN_PIN, 0)  
+
+                    overpaid = max(0, total_inserted - product_price) 
+
+                    if total_inserted == product_price:
+                        log_transaction(f"✅ Transaksi selesai, total: Rp.{total_inserted}")
+                    else:
+                        log_transaction(f"✅ Transaksi selesai, kelebihan: Rp.{overpaid}")
+
+                    # Kirim status transaksi
+                    send_transaction_status()
+                    trigger_transaction()
+            if remaining_time == 0:
+                    # imeout tercapai, hentikan transaksi
+                    transaction_active = False
+                    pi.write(config.EN_PIN, 0) 
+
+                    remaining_due = max(0, product_price - total_inserted)
+                    overpaid = max(0, total_inserted - product_price) 
+
+                    if total_inserted < product_price:
+                        log_transaction(f"⏰ Timeout! Kurang: Rp.{remaining_due}")
+                    elif total_inserted == product_price:
+                        log_transaction(f"✅ Transaksi sukses, total: Rp.{total_inserted}")
+                    else:
+                        log_transaction(f"✅ Transaksi sukses, kelebihan: Rp.{overpaid}")
+                    send_transaction_status()
+                    transaction_active = False
+                    trigger_transaction()
+                    break
+            console(f"\r⏳ Timeout dalam {remaining_time} detik...", end="")
+
+            # Tidur sampai deadline berikutnya atau pulsa pertama; hitung mundur per detik hanya di mode verbose
+            wait_time = max(0, next_timer_deadline() - current_time) + TIMER_SLACK
+            if config.VERBOSE:
+                wait_time = min(wait_time, 1)
+            idle_monitor.wait(pulse_event, wait_time, "gpio")
+
+def process_final_pulse_count():
+    """Memproses pulsa yang terkumpul setelah tidak ada pulsa masuk selama SETTLE_TIME detik."""
+    global pending_pulse_count, total_inserted, pulse_count, burst_span
+
+    if pending_pulse_count == 0:
+        return
+
+    # Koreksi pulsa dengan toleransi ±2
+    corrected_pulses = decoder.closest_valid_pulse(pending_pulse_count)
+
+    if corrected_pulses:
+        received_amount = decoder.pulse_amount(corrected_pulses)
+        total_inserted += received_amount
+        remaining_due = max(product_price - total_inserted, 0)
+
+        log_transaction(f"💰 Koreksi pulsa: {pending_pulse_count} -> {corrected_pulses} ({received_amount}) | Total: Rp.{total_inserted} | Sisa: Rp.{remaining_due}")
+    
+    else:
+        log_transaction(f"⚠ Pulsa {pending_pulse_count} tidak valid!")
+
+    pulse_capture.finish(pending_pulse_count, corrected_pulses)
+    tracing.end_span(burst_span, pulses=pending_pulse_count, corrected_pulses=corrected_pulses or 0, valid=bool(corrected_pulses))
+    burst_span = None
+    pending_pulse_count = 0 
+    pi.write(config.EN_PIN, 1)
+    console("✅ Koreksi selesai, EN_PIN diaktifkan kembali")
+
+# Reset transaksi setelah selesai
+def reset_transaction():
+    global transaction_active, total_inserted, id_trx, payment_token, product_price, last_pulse_received_time, insufficient_payment_count, pending_pulse_count, transaction_span
+    tracing.end_span(transaction_span, total_inserted=total_inserted)
+    transaction_span = None
+    transaction_active = False
+    total_inserted = 0
+    id_trx = None
+    payment_token = None
+    product_price = 0
+    last_pulse_received_time = time.time()  
+    insufficient_payment_count = 0  
+    pending_pulse_count = 0  
+    log_transaction("🔄 Transaksi di-reset ke default.")
+    token_event.set()
+
+@app.route('/api/status', methods=['GET'])
+def get_bill_acceptor_status():
+    global transaction_active
+    
+    if transaction_active:
+        return jsonify({
+            "status": "error",
+            "message": "Bill acceptor sedang dalam transaksi"
+        }), 409 
+
+    return jsonify({
+        "status": "success",
+        "message": "Bill acceptor siap digunakan"
+    }), 200 
+
+@app.route('/api/token', methods=['POST'])
+def push_token():
+    """Notifikasi token baru dari backend; membangunkan loop transaksi tanpa menunggu polling.
+
+    Isi request diabaikan: token selalu diambil ulang dari TOKEN_API milik perangkat ini,
+    sehingga klien tidak bisa memasukkan token perangkat lain ke antrian.
+    """
+    refresh_event.set()
+    token_event.set()
+    watch_event.set()
+    return jsonify({
+        "status": "success",
+        "message": "Polling token dijadwalkan"
+    }), 202
+
+@app.route('/api/power', methods=['GET'])
+def get_power_stats():
+    return jsonify({
+        "status": "success",
+        "low_power": config.LOW_POWER,
+        "verbose": config.VERBOSE,
+        "stats": idle_monitor.report()
+    }), 200
+
+@app.route('/api/debug/tracing', methods=['GET'])
+def get_tracing():
+    spans = tracing.get_spans(request.args.get("trace_id"))
+    return jsonify({
+        "status": "success",
+        "enabled": tracing.enabled,
+        "spans": [span.to_dict() for span in spans]
+    }), 200
+
+@app.route('/api/debug/tracing', methods=['POST'])
+def set_tracing():
+    data = request.get_json(silent=True) or {}
+    tracing.set_enabled(data.get("enabled", False))
+    log_transaction(f"🔧 Tracing {'diaktifkan' if tracing.enabled else 'dinonaktifkan'}")
+    return jsonify({
+        "status": "success",
+        "enabled": tracing.enabled
+    }), 200
+
+@app.route('/api/debug/tracing/export', methods=['POST'])
+def export_tracing():
+    data = request.get_json(silent=True) or {}
+    try:
+        path = tracing.export_otlp(config.TRACE_DIR, data.get("trace_id"))
+    except OSError as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Gagal menyimpan trace: {e}"
+        }), 500
+
+    return jsonify({
+        "status": "success",
+        "file": path
+    }), 200
+
+@app.route('/api/debug/profiler', methods=['GET'])
+def get_profiler():
+    return tracing.folded_profile(), 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+@app.route('/api/debug/profiler', methods=['POST'])
+def set_profiler():
+    data = request.get_json(silent=True) or {}
+    if data.get("enabled", False):
+        try:
+            tracing.start_profiler(data.get("interval"))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": f"Interval profiler tidak valid: {e}"
+            }), 400
+        if data.get("reset", False):
+            tracing.get_profile(reset=True)
+    else:
+        tracing.stop_profiler()
+    log_transaction(f"🔧 Profiler {'diaktifkan' if tracing.profiler_running() else 'dinonaktifkan'}")
+    return jsonify({
+        "status": "success",
+        "enabled": tracing.profiler_running()
+    }), 200
+
+@app.route('/api/debug/pulses', methods=['GET'])
+def get_pulse_capture():
+    return jsonify({
+        "status": "success",
+        "bursts": pulse_capture.records(),
+        "calibration": calibration or analyze_pulses()
+    }), 200
+
+@app.route('/api/debug/pulses/calibrate', methods=['POST'])
+def calibrate_pulses():
+    data = request.get_json(silent=True) or {}
+    if data.get("apply", False) and transaction_active:
+        return jsonify({
+            "status": "error",
+            "message": "Kalibrasi tidak bisa diterapkan saat transaksi berjalan"
+        }), 409
+
+    analysis = analyze_pulses()
+    applied = apply_calibration(analysis["suggested"]) if data.get("apply", False) else {}
+    return jsonify({
+        "status": "success",
+        "calibration": analysis,
+        "applied": applied
+    }), 200
+
+# Fungsi analisis & kalibrasi pulsa
+def analyze_pulses():
+    global calibration
+    calibration = pulse_capture.analyze(config.DEBOUNCE_TIME, config.TOLERANCE, config.SETTLE_TIME)
+    return calibration
+
+def apply_calibration(suggested):
+    """Menerapkan nilai debounce, toleransi dan settle hasil kalibrasi."""
+    applied = {}
+    if suggested.get("debounce_time") is not None:
+        config.DEBOUNCE_TIME = applied["debounce_time"] = suggested["debounce_time"]
+    if suggested.get("tolerance") is not None:
+        config.TOLERANCE = applied["tolerance"] = suggested["tolerance"]
+    if suggested.get("settle_time") is not None:
+        config.SETTLE_TIME = applied["settle_time"] = suggested["settle_time"]
+    if applied:
+        log_transaction(f"🔧 Kalibrasi pulsa diterapkan: {applied}")
+        save_calibration()
+    return applied
+
+def calibration_file():
+    return os.path.join(config.LOG_DIR, f"calibration-{config.ID_DEVICE}.json")
+
+def save_calibration():
+    """Menyimpan nilai kalibrasi per perangkat agar tetap dipakai setelah restart."""
+    values = {
+        "debounce_time": config.DEBOUNCE_TIME,
+        "tolerance": config.TOLERANCE,
+        "settle_time": config.SETTLE_TIME,
+    }
+    try:
+        with open(calibration_file(), "w") as f:
+            json.dump(values, f)
+    except OSError as e:
+        log_transaction(f"⚠ Gagal menyimpan kalibrasi pulsa: {e}")
+
+def load_calibration():
+    """Memuat kalibrasi tersimpan untuk ID_DEVICE, jika ada."""
+    path = calibration_file()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            values = json.load(f)
+        loaded = {}
+        if values.get("debounce_time") is not None:
+            config.DEBOUNCE_TIME = loaded["debounce_time"] = float(values["debounce_time"])
+        if values.get("tolerance") is not None:
+            config.TOLERANCE = loaded["tolerance"] = int(values["tolerance"])
+        if values.get("settle_time") is not None:
+            config.SETTLE_TIME = loaded["settle_time"] = float(values["settle_time"])
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        log_transaction(f"⚠ Kalibrasi pulsa tersimpan tidak valid, diabaikan: {e!r}")
+        return {}
+    if loaded:
+        log_transaction(f"🔧 Kalibrasi pulsa dimuat dari {path}: {loaded}")
+    return loaded
+
+def calibration_loop():
+    while True:
+        time.sleep(config.CALIBRATION_INTERVAL)
+        analysis = analyze_pulses()
+        if config.AUTO_CALIBRATE and not transaction_active:
+            apply_calibration(analysis["suggested"])
+
+@app.route('/api/queue', methods=['GET'])
+def get_invoice_queue():
+    return jsonify({
+        "status": "success",
+        "queue": invoice_queue.snapshot()
+    }), 200
+
+# Fungsi GET daftar payment token ke antrian invoice
+def refresh_invoice_queue(trace=None):
+    """Polling TOKEN_API; span token.poll dicatat kecuali polling idle yang cepat, sukses dan kosong."""
+    poll_span = tracing.start_span("token.poll", trace)
+    try:
+        response = api.get_tokens()
+        response_data = response.json()
+    except Exception as e:
+        tracing.end_span(poll_span, error=repr(e))
+        raise
+
+    returned = queued = 0
+    if response.status_code == 200 and "data" in response_data:
+        errors = []
+        returned = len(response_data["data"] or [])
+        for token, created in tokens.iter_tokens(response_data, errors=errors):
+            if invoice_queue.push(token, created):
+                queued += 1
+                log_transaction(f"📥 Token masuk antrian: {token}, umur: {(time.time() - created) / 60:.2f} menit")
+        for error in errors:
+            log_transaction(f"⚠ Data payment token tidak valid, dilewati: {error!r}")
+
+    # Polling idle kosong yang cepat tidak dicatat agar ring buffer tidak penuh oleh span kosong
+    if poll_span is not None and (returned or response.status_code != 200 or poll_span.duration_ms() >= POLL_SPAN_MIN_MS):
+        tracing.end_span(poll_span, status_code=response.status_code, tokens=returned, queued=queued)
+
+    for token in invoice_queue.evict():
+        log_transaction(f"🗑 Token {token} kedaluwarsa, dikeluarkan dari antrian")
+    return queued
+
+# Fungsi GET detail invoice untuk token di antrian
+def fetch_queued_invoice(entry, trace=None):
+    if entry.invoice_fresh():
+        return entry.invoice
+
+    with tracing.span("invoice.get", trace, payment_token=entry.token):
+        invoice_response = api.get_invoice(entry.token)
+    invoice_data = invoice_response.json()
+
+    if invoice_response.status_code == 200 and "data" in invoice_data:
+        invoice_queue.set_invoice(entry.token, invoice_data["data"])
+        return invoice_data["data"]
+    return None
+
+def preload_next_invoice():
+    """Mengambil detail invoice pelanggan berikutnya selagi transaksi berjalan."""
+    try:
+        entry = invoice_queue.peek()
+        if entry is None or entry.invoice_fresh():
+            return
+        invoice = fetch_queued_invoice(entry)
+        # Gagal GET invoice tidak menghapus token; trigger_transaction akan mencoba lagi
+        if invoice is not None and invoice.get("isPaid", False):
+            invoice_queue.mark_done(entry.token)
+    except api.RequestException as e:
+        log_transaction(f"⚠ Gagal preload invoice berikutnya: {e}")
+    except (KeyError, ValueError) as e:
+        log_transaction(f"⚠ Data invoice tidak valid saat preload: {e!r}")
+
+def invoice_queue_loop():
+    while True:
+        # Saat idle, blok sampai transaksi dimulai
+        active_event.wait()
+        time.sleep(config.QUEUE_POLL_INTERVAL)
+        if not transaction_active:
+            active_event.clear()
+            if not transaction_active:
+                continue
+        try:
+            refresh_invoice_queue()
+        except api.RequestException as e:
+            log_transaction(f"⚠ Gagal mengambil daftar payment token: {e}")
+            continue
+        except (KeyError, ValueError) as e:
+            log_transaction(f"⚠ Data payment token tidak valid: {e!r}")
+            continue
+        preload_next_invoice()
+
+def trigger_transaction():
+    global transaction_active, total_inserted, id_trx, payment_token, product_price, last_pulse_received_time, pending_pulse_count, trace_id, transaction_span
+    
+    while True:
+        token_event.clear()
+        if transaction_active:
+            idle_monitor.wait(token_event, idle_poll_interval(), "token")
+            continue
+
+        idle_monitor.set_idle(True)
+        # ID trace hanya dibuat saat tracing aktif agar loop idle tidak memanggil os.urandom
+        trace_id = tracing.new_trace_id() if tracing.enabled else None
+        
+        try:
+            # Invoice berikutnya diambil langsung dari antrian, polling hanya jika antrian kosong atau ada notifikasi token
+            if refresh_event.is_set() or invoice_queue.peek() is None:
+                refresh_event.clear()
+                console("🔍 Mencari payment token terbaru...")
+                refresh_invoice_queue(trace_id)
+
+            entry = invoice_queue.peek()
+            while entry is not None:
+                payment_token = entry.token
+                log_transaction(f"✅ Token ditemukan: {payment_token}, umur: {entry.age() / 60:.2f} menit")
+
+                try:
+                    invoice = fetch_queued_invoice(entry, trace_id)
+                except api.RequestException:
+                    invoice_queue.defer(payment_token)
+                    raise
+
+                if invoice is None:
+                    # Token tetap di antrian agar GET invoice yang gagal sementara (mis. 5xx) dicoba lagi
+                    invoice_queue.defer(payment_token)
+                    log_transaction(f"⚠ Gagal mengambil invoice {payment_token}, dicoba lagi nanti")
+                else:
+                    invoice_queue.mark_done(payment_token)
+                    if not invoice.get("isPaid", False):
+                        id_trx = invoice["ID"]
+                        product_price = int(invoice["productPrice"])
+
+                        transaction_active = True
+                        pending_pulse_count = 0 
+                        last_pulse_received_time = time.time()
+                        transaction_span = tracing.start_span("transaction", trace_id, id_trx=id_trx, payment_token=payment_token, product_price=product_price)
+                        log_transaction(f"🔔 Transaksi dimulai! ID: {id_trx}, Token: {payment_token}, Tagihan: Rp.{product_price}, Trace: {trace_id}, Antrian: {len(invoice_queue)}")
+                        pi.write(config.EN_PIN, 1)
+                        idle_monitor.set_idle(False)
+                        active_event.set()
+                        threading.Thread(target=start_timeout_timer, daemon=True).start()
+                        threading.Thread(target=preload_next_invoice, daemon=True).start()
+                        return
+                    else:
+                        log_transaction(f"⚠ Invoice {payment_token} sudah dibayar, mencari lagi...")
+
+                entry = invoice_queue.peek()
+
+            console("✅ Tidak ada payment token yang memenuhi syarat. Menunggu...")
+            idle_monitor.wait(token_event, idle_poll_interval(), "token")
+
+        except api.RequestException as e:
+            log_transaction(f"⚠ Gagal mengambil daftar payment token: {e}")
+            idle_monitor.wait(token_event, idle_poll_interval(), "token")
+
+        except (KeyError, ValueError) as e:
+            log_transaction(f"⚠ Data payment token/invoice tidak valid: {e!r}")
+            idle_monitor.wait(token_event, idle_poll_interval(), "token")
+
+def run(host="0.0.0.0", port=5000, watch_tokens=False):
+    """Menjalankan layanan bill acceptor (GPIO, antrian invoice dan API Flask)."""
+    ensure_log_dir()
+    load_calibration()
+    if not init_gpio():
+        return 1
+
+    tracing.set_enabled(config.TRACING_ENABLED)
+    pi.callback(config.BILL_ACCEPTOR_PIN, pigpio.RISING_EDGE, count_pulse)
+    pi.callback(config.BILL_ACCEPTOR_PIN, pigpio.FALLING_EDGE, record_pulse_edge)
+    start_threads(watch_tokens)
+    serve(host, port)
+    return 0
+
+def start_threads(watch_tokens=False):
+    """Menjalankan loop kalibrasi, antrian invoice, transaksi dan (opsional) pemantau token."""
+    idle_monitor.set_periodic("calibration", config.CALIBRATION_INTERVAL)
+    threading.Thread(target=calibration_loop, daemon=True).start()
+    threading.Thread(target=invoice_queue_loop, daemon=True).start()
+    threading.Thread(target=trigger_transaction, daemon=True).start()
+    if watch_tokens and not config.VERBOSE:
+        # Semua output pemantau ditekan console(), jadi polling-nya hanya menambah wakeup dan trafik radio
+        log_transaction("ℹ Pemantau token tidak dijalankan karena output konsol dimatikan (gunakan --verbose)")
+    elif watch_tokens:
+        from . import watch
+        interval = idle_poll_interval()
+
+        def wait_watch(timeout):
+            idle_monitor.wait(watch_event, timeout, "watch_tokens")
+            watch_event.clear()
+
+        threading.Thread(target=watch.main_loop, args=(interval, wait_watch), daemon=True).start()
+
+def create_server(host="0.0.0.0", port=5000):
+    return make_server(host, port, app, threaded=True)
+
+def serve(host="0.0.0.0", port=5000, server=None):
+    """Melayani API Flask; pengganti app.run() agar interval polling server bisa diperpanjang di mode hemat daya."""
+    server = server or create_server(host, port)
+    interval = server_poll_interval()
+    idle_monitor.set_periodic("http_server", interval)
+    console(f"🌐 API berjalan di http://{host}:{server.server_port}")
+    server.serve_forever(poll_interval=interval)
@@ -0,0 +1,72 @@
+import collections
+import threading
+import time
+
+
+class IdleMonitor:
+    """Menghitung wakeup per menit dan waktu CPU selama perangkat idle.
+
+    Hanya wakeup dari wait() yang terjadi saat idle yang dihitung. Loop yang tidak memakai
+    wait() (mis. server HTTP atau kalibrasi) didaftarkan lewat set_periodic() dan dihitung
+    dari intervalnya.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.wakeups = collections.Counter()
+        self.periodic = {}
+        self.idle_since = None
+        self.idle_cpu_since = None
+        self.idle_seconds = 0.0
+        self.idle_cpu = 0.0
+
+    def wait(self, event, timeout, reason):
+        """Blok sampai event di-set (reason) atau deadline tercapai, lalu mencatat wakeup jika sedang idle."""
+        fired = event.wait(timeout)
+        with self.lock:
+            if self.idle_since is not None:
+                self.wakeups[reason if fired else f"{reason}_deadline"] += 1
+        return fired
+
+    def set_periodic(self, name, interval):
+        """Mendaftarkan loop yang bangun setiap `interval` detik tanpa melalui wait()."""
+        with self.lock:
+            if interval:
+                self.periodic[name] = interval
+            else:
+                self.periodic.pop(name, None)
+
+    def set_idle(self, idle):
+        with self.lock:
+            if idle and self.idle_since is None:
+                self.idle_since = time.monotonic()
+                self.idle_cpu_since = time.process_time()
+            elif not idle and self.idle_since is not None:
+                self.idle_seconds += time.monotonic() - self.idle_since
+                self.idle_cpu += time.process_time() - self.idle_cpu_since
+                self.idle_since = None
+                self.idle_cpu_since = None
+
+    def report(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            idle_seconds = self.idle_seconds
+            idle_cpu = self.idle_cpu
+            if self.idle_since is not None:
+                idle_seconds += time.monotonic() - self.idle_since
+                idle_cpu += time.process_time() - self.idle_cpu_since
+            wakeups = dict(self.wakeups)
+            periodic = dict(self.periodic)
+
+        idle_minutes = idle_seconds / 60
+        measured = sum(wakeups.values())
+        periodic_per_minute = sum(60 / interval for interval in periodic.values())
+        return {
+            "uptime_seconds": round(elapsed, 1),
+            "idle_seconds": round(idle_seconds, 1),
+            "wakeups": wakeups,
+            "periodic": periodic,
+            "wakeups_per_minute": round(measured / idle_minutes + periodic_per_minute, 2) if idle_seconds else 0,
+            "cpu_seconds_per_idle_hour": round(idle_cpu / (idle_seconds / 3600), 3) if idle_seconds else 0,
+        }
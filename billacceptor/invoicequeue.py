@@ -0,0 +1,135 @@
+import heapq
+import itertools
+import threading
+import time
+
+from . import config
+
+# Konfigurasi antrian invoice
+INVOICE_PRELOAD_MAX_AGE = 60
+INVOICE_RETRY_DELAY = 1
+
+
+class QueuedInvoice:
+    """Satu payment token di antrian, beserta detail invoice yang sudah di-preload."""
+
+    __slots__ = ("token", "created", "expires", "invoice", "fetched_at", "retry_at")
+
+    def __init__(self, token, created, expires):
+        self.token = token
+        self.created = created
+        self.expires = expires
+        self.invoice = None
+        self.fetched_at = None
+        self.retry_at = None
+
+    def age(self, now=None):
+        return (now if now is not None else time.time()) - self.created
+
+    def invoice_fresh(self, now=None):
+        if self.invoice is None:
+            return False
+        return (now if now is not None else time.time()) - self.fetched_at <= INVOICE_PRELOAD_MAX_AGE
+
+    def to_dict(self, now=None):
+        return {
+            "paymentToken": self.token,
+            "ageSeconds": round(self.age(now), 1),
+            "expiresIn": round(self.expires - (now if now is not None else time.time()), 1),
+            "preloaded": self.invoice is not None,
+        }
+
+
+class InvoiceQueue:
+    """Antrian prioritas payment token: urut waktu dibuat lalu kedaluwarsa, tanpa duplikat."""
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age if max_age is not None else config.TOKEN_MAX_AGE
+        self.heap = []
+        self.entries = {}
+        self.done = {}
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def push(self, token, created, now=None):
+        """Menambahkan token; mengembalikan False jika duplikat, sudah diproses atau terlalu lama."""
+        now = now if now is not None else time.time()
+        expires = created + self.max_age
+        with self.lock:
+            if token in self.entries or token in self.done or expires <= now:
+                return False
+            entry = QueuedInvoice(token, created, expires)
+            self.entries[token] = entry
+            heapq.heappush(self.heap, (created, expires, next(self.counter), token))
+            return True
+
+    def evict(self, now=None):
+        """Membuang token yang umurnya melewati max_age."""
+        now = now if now is not None else time.time()
+        evicted = []
+        with self.lock:
+            for token, entry in list(self.entries.items()):
+                if entry.expires <= now:
+                    del self.entries[token]
+                    evicted.append(token)
+            for token, expires in list(self.done.items()):
+                if expires <= now:
+                    del self.done[token]
+            self.heap = [item for item in self.heap if item[3] in self.entries]
+            heapq.heapify(self.heap)
+        return evicted
+
+    def peek(self, now=None):
+        """Token tertua yang belum kedaluwarsa dan tidak sedang menunggu retry."""
+        now = now if now is not None else time.time()
+        with self.lock:
+            while self.heap:
+                entry = self.entries.get(self.heap[0][3])
+                if entry is not None and entry.expires > now:
+                    break
+                heapq.heappop(self.heap)
+                if entry is not None:
+                    del self.entries[entry.token]
+            # Antrian hanya berisi beberapa token, jadi entri yang ditunda cukup dilewati secara berurutan
+            for item in sorted(self.heap):
+                entry = self.entries.get(item[3])
+                if entry is not None and entry.expires > now and (entry.retry_at is None or entry.retry_at <= now):
+                    return entry
+            return None
+
+    def defer(self, token, delay=None, now=None):
+        """Menunda token setelah GET invoice gagal; token tetap di antrian dan dicoba lagi setelah `delay` detik."""
+        delay = delay if delay is not None else INVOICE_RETRY_DELAY
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                return False
+            entry.retry_at = (now if now is not None else time.time()) + delay
+            entry.invoice = None
+            entry.fetched_at = None
+            return True
+
+    def mark_done(self, token):
+        with self.lock:
+            entry = self.entries.pop(token, None)
+            expires = entry.expires if entry is not None else time.time() + self.max_age
+            self.done[token] = expires
+
+    def set_invoice(self, token, invoice, now=None):
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                return False
+            entry.invoice = invoice
+            entry.fetched_at = now if now is not None else time.time()
+            return True
+
+    def snapshot(self, now=None):
+        now = now if now is not None else time.time()
+        with self.lock:
+            entries = sorted(self.entries.values(), key=lambda e: (e.created, e.expires))
+            return [entry.to_dict(now) for entry in entries]
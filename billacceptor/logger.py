@@ -0,0 +1,31 @@
+import datetime
+import os
+import threading
+
+from . import config
+
+log_lock = threading.Lock()
+print_lock = threading.Lock()
+
+
+def ensure_log_dir():
+    if not os.path.exists(config.LOG_DIR):
+        os.makedirs(config.LOG_DIR)
+
+
+# Fungsi log transaction
+def log_transaction(message):
+    timestamp = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+    with log_lock:
+        with open(config.LOG_FILE, "a") as log:
+            log.write(f"{timestamp} {message}\n")
+
+    console(f"{timestamp} {message}")
+
+
+# Output konsol hanya pada mode verbose
+def console(message, end="\n"):
+    if not config.VERBOSE:
+        return
+    with print_lock:
+        print(message, end=end)
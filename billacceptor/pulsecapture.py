@@ -0,0 +1,251 @@
+import array
+import collections
+import math
+import threading
+import time
+
+from . import decoder
+
+# Konfigurasi capture & kalibrasi
+BURST_BUFFER_SIZE = 512
+CALIBRATION_MIN_SAMPLES = 20
+MAX_TOLERANCE = 4
+DEBOUNCE_MARGIN = 0.5
+MIN_DEBOUNCE_TIME = 0.005
+MAX_DEBOUNCE_TIME = 0.2
+SETTLE_MARGIN = 3
+MIN_SETTLE_TIME = 0.3
+MAX_SETTLE_TIME = 2.0
+HISTOGRAM_BIN_MS = 5
+
+# Kolom ring buffer: nama -> typecode array
+BURST_FIELDS = (
+    ("timestamp", "d"),
+    ("raw_pulses", "H"),
+    ("pulses", "H"),
+    ("corrected_pulses", "H"),
+    ("duration_us", "I"),
+    ("min_gap_us", "I"),
+    ("max_gap_us", "I"),
+    ("mean_gap_us", "I"),
+    ("min_width_us", "I"),
+    ("max_width_us", "I"),
+    ("mean_width_us", "I"),
+)
+
+_LIMITS = {"H": 0xFFFF, "I": 0xFFFFFFFF}
+
+
+def tick_diff(start, end):
+    """Selisih tick pigpio (mikrodetik) dengan memperhitungkan wrap 32-bit."""
+    return (end - start) & 0xFFFFFFFF
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(math.ceil(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class BurstRing:
+    """Ring buffer ukuran tetap berbasis array untuk statistik burst pulsa."""
+
+    def __init__(self, size=BURST_BUFFER_SIZE):
+        self.size = size
+        self.index = 0
+        self.length = 0
+        self.columns = {name: array.array(code, [0]) * size for name, code in BURST_FIELDS}
+
+    def __len__(self):
+        return self.length
+
+    def append(self, **values):
+        for name, code in BURST_FIELDS:
+            value = values.get(name, 0)
+            if code in _LIMITS:
+                value = min(max(int(value), 0), _LIMITS[code])
+            self.columns[name][self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.length = min(self.length + 1, self.size)
+
+    def records(self):
+        """Mengembalikan isi buffer dari yang terlama ke terbaru."""
+        start = (self.index - self.length) % self.size
+        result = []
+        for offset in range(self.length):
+            i = (start + offset) % self.size
+            result.append({name: self.columns[name][i] for name, _ in BURST_FIELDS})
+        return result
+
+    def clear(self):
+        self.index = 0
+        self.length = 0
+
+
+class PulseCapture:
+    """Merekam tick pigpio mentah per burst (satu lembar uang) ke BurstRing."""
+
+    def __init__(self, pulse_mapping, size=BURST_BUFFER_SIZE):
+        self.pulse_mapping = pulse_mapping
+        self.ring = BurstRing(size)
+        self.lock = threading.Lock()
+        self._reset_burst()
+
+    def _reset_burst(self):
+        self.first_tick = None
+        self.last_rising = None
+        self.last_falling = None
+        self.raw_pulses = 0
+        self.gaps = []
+        self.widths = []
+
+    def rising(self, tick):
+        """Dipanggil untuk setiap rising edge (sebelum debounce)."""
+        with self.lock:
+            if self.first_tick is None:
+                self.first_tick = tick
+            elif self.last_rising is not None:
+                self.gaps.append(tick_diff(self.last_rising, tick))
+            if self.last_falling is not None:
+                self.widths.append(tick_diff(self.last_falling, tick))
+                self.last_falling = None
+            self.last_rising = tick
+            self.raw_pulses += 1
+
+    def falling(self, tick):
+        """Dipanggil untuk setiap falling edge, untuk mengukur lebar pulsa."""
+        with self.lock:
+            self.last_falling = tick
+
+    def finish(self, pulses, corrected_pulses):
+        """Menutup burst saat ini dan menyimpannya ke ring buffer."""
+        with self.lock:
+            if self.raw_pulses == 0 and pulses == 0:
+                self._reset_burst()
+                return
+            gaps, widths = self.gaps, self.widths
+            duration = tick_diff(self.first_tick, self.last_rising) if self.first_tick is not None else 0
+            self.ring.append(
+                timestamp=time.time(),
+                raw_pulses=self.raw_pulses,
+                pulses=pulses,
+                corrected_pulses=corrected_pulses or 0,
+                duration_us=duration,
+                min_gap_us=min(gaps) if gaps else 0,
+                max_gap_us=max(gaps) if gaps else 0,
+                mean_gap_us=sum(gaps) / len(gaps) if gaps else 0,
+                min_width_us=min(widths) if widths else 0,
+                max_width_us=max(widths) if widths else 0,
+                mean_width_us=sum(widths) / len(widths) if widths else 0,
+            )
+            self._reset_burst()
+
+    def records(self):
+        with self.lock:
+            return self.ring.records()
+
+    def clear(self):
+        with self.lock:
+            self.ring.clear()
+            self._reset_burst()
+
+    def analyze(self, debounce_time, tolerance, settle_time):
+        """Membuat histogram per nominal dan saran nilai debounce, toleransi dan settle."""
+        records = self.records()
+        histograms = collections.defaultdict(lambda: {
+            "count": 0,
+            "pulses": collections.Counter(),
+            "raw_pulses": collections.Counter(),
+            "mean_gap_ms": collections.Counter(),
+            "mean_width_ms": collections.Counter(),
+        })
+        deviations = []
+        clean_min_gaps = []
+        noisy_min_gaps = []
+        max_gaps = []
+
+        for record in records:
+            corrected = record["corrected_pulses"]
+            key = str(self.pulse_mapping.get(corrected)) if corrected else "invalid"
+            hist = histograms[key]
+            hist["count"] += 1
+            hist["pulses"][record["pulses"]] += 1
+            hist["raw_pulses"][record["raw_pulses"]] += 1
+            if record["mean_gap_us"]:
+                hist["mean_gap_ms"][_bin_ms(record["mean_gap_us"])] += 1
+            if record["mean_width_us"]:
+                hist["mean_width_ms"][_bin_ms(record["mean_width_us"])] += 1
+
+            if record["pulses"] > 0:
+                # Deviasi dihitung dengan aturan decoder agar kalibrasi dan decoding konsisten
+                deviation = decoder.required_tolerance(record["pulses"], self.pulse_mapping)
+                if deviation <= MAX_TOLERANCE:
+                    deviations.append(deviation)
+            if record["min_gap_us"]:
+                if record["raw_pulses"] == record["pulses"] and corrected:
+                    clean_min_gaps.append(record["min_gap_us"])
+                elif record["raw_pulses"] > record["pulses"]:
+                    noisy_min_gaps.append(record["min_gap_us"])
+            if record["max_gap_us"]:
+                max_gaps.append(record["max_gap_us"])
+
+        suggested = {
+            "debounce_time": _suggest_debounce(clean_min_gaps, noisy_min_gaps),
+            "tolerance": _suggest_tolerance(deviations, tolerance),
+            "settle_time": _suggest_settle(max_gaps),
+        }
+        invalid = histograms["invalid"]["count"] if "invalid" in histograms else 0
+        return {
+            "samples": len(records),
+            "valid": len(records) - invalid,
+            "invalid": invalid,
+            "current": {
+                "debounce_time": debounce_time,
+                "tolerance": tolerance,
+                "settle_time": settle_time,
+            },
+            "suggested": suggested,
+            "histograms": {
+                key: {
+                    "count": hist["count"],
+                    "pulses": dict(sorted(hist["pulses"].items())),
+                    "raw_pulses": dict(sorted(hist["raw_pulses"].items())),
+                    "mean_gap_ms": dict(sorted(hist["mean_gap_ms"].items())),
+                    "mean_width_ms": dict(sorted(hist["mean_width_ms"].items())),
+                }
+                for key, hist in histograms.items()
+            },
+        }
+
+
+def _bin_ms(value_us):
+    return int(value_us / 1000 // HISTOGRAM_BIN_MS * HISTOGRAM_BIN_MS)
+
+
+def _suggest_tolerance(deviations, current=1):
+    """Toleransi yang menerima setiap deviasi yang pernah terlihat; tidak pernah di bawah nilai saat ini."""
+    if len(deviations) < CALIBRATION_MIN_SAMPLES:
+        return None
+    return max(current, min(MAX_TOLERANCE, max(deviations)))
+
+
+def _suggest_debounce(clean_min_gaps, noisy_min_gaps):
+    """Debounce di bawah jarak pulsa asli, tetapi di atas jarak glitch yang terlihat."""
+    if len(clean_min_gaps) < CALIBRATION_MIN_SAMPLES:
+        return None
+    shortest_valid = percentile(clean_min_gaps, 0.05) / 1e6
+    debounce = shortest_valid * DEBOUNCE_MARGIN
+    if noisy_min_gaps:
+        longest_glitch = percentile(noisy_min_gaps, 0.95) / 1e6
+        debounce = min(max(debounce, longest_glitch * 1.2), shortest_valid * 0.9)
+    return round(min(max(debounce, MIN_DEBOUNCE_TIME), MAX_DEBOUNCE_TIME), 3)
+
+
+def _suggest_settle(max_gaps):
+    """Jeda settle cukup beberapa kali jarak antar pulsa terpanjang dalam satu burst."""
+    if len(max_gaps) < CALIBRATION_MIN_SAMPLES:
+        return None
+    settle = percentile(max_gaps, 0.99) / 1e6 * SETTLE_MARGIN
+    return round(min(max(settle, MIN_SETTLE_TIME), MAX_SETTLE_TIME), 2)
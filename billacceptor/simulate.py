@@ -0,0 +1,174 @@
+import random
+
+from . import config
+from .invoicequeue import InvoiceQueue
+
+# Konfigurasi simulator antrian pelanggan
+SIM_POLL_INTERVAL = 1
+SIM_REQUEST_LATENCY = 0.3
+SIM_TIMEOUT = config.TIMEOUT
+SIM_SETTLE_TIME = config.SETTLE_TIME
+SIM_QUEUE_POLL_INTERVAL = config.QUEUE_POLL_INTERVAL
+
+
+def generate_arrivals(hours, seed, burst_interval=240, max_burst=4, abandon_rate=0.1):
+    """Membuat kedatangan pelanggan bergerombol (burst) untuk simulasi."""
+    rng = random.Random(seed)
+    customers = []
+    t = 0.0
+    end = hours * 3600
+    while True:
+        t += rng.expovariate(1 / burst_interval)
+        if t >= end:
+            break
+        for _ in range(rng.randint(1, max_burst)):
+            customers.append({
+                "token": f"sim-{len(customers)}",
+                "created": t + rng.uniform(0, 15),
+                "service": rng.uniform(20, 60),
+                "abandons": rng.random() < abandon_rate,
+            })
+    customers.sort(key=lambda c: c["created"])
+    return customers
+
+
+class _SimBackend:
+    """API palsu dengan jam simulasi: daftar token terbaru dulu dan status invoice."""
+
+    def __init__(self, customers, max_age):
+        self.customers = customers
+        self.max_age = max_age
+        self.paid = set()
+        self.waits = []
+        self.busy = 0.0
+
+    def tokens(self, now):
+        return [
+            c for c in reversed(self.customers)
+            if c["created"] <= now and now - c["created"] <= self.max_age
+        ]
+
+    def next_arrival(self, now):
+        for c in self.customers:
+            if c["created"] > now:
+                return c["created"]
+        return None
+
+    def transaction(self, customer, start):
+        """Durasi transaksi sampai POST status; mengembalikan waktu selesai."""
+        if customer["abandons"]:
+            end = start + SIM_TIMEOUT
+        else:
+            end = start + customer["service"] + SIM_SETTLE_TIME
+            self.paid.add(customer["token"])
+            self.waits.append(start - customer["created"])
+        self.busy += end - start
+        return end
+
+    def result(self, t):
+        hours = max(t, self.customers[-1]["created"] if self.customers else 0) / 3600
+        paying = sum(1 for c in self.customers if not c["abandons"])
+        waits = sorted(self.waits)
+        return {
+            "served": len(self.paid),
+            "lost": paying - len(self.paid),
+            "transactions_per_hour": round(len(self.paid) / hours, 2) if hours else 0,
+            "mean_wait": round(sum(waits) / len(waits), 1) if waits else 0,
+            "p90_wait": round(waits[int(0.9 * (len(waits) - 1))], 1) if waits else 0,
+            "utilization": round(self.busy / t, 3) if t else 0,
+        }
+
+
+def _simulate_legacy(customers, max_age):
+    """Loop lama: GET token lalu GET invoice untuk tiap token (terbaru dulu) sampai ada yang belum dibayar."""
+    backend = _SimBackend(customers, max_age)
+    t = 0.0
+    while True:
+        t += SIM_REQUEST_LATENCY
+        started = False
+        for customer in backend.tokens(t):
+            t += SIM_REQUEST_LATENCY
+            if customer["token"] in backend.paid:
+                continue
+            t = backend.transaction(customer, t) + SIM_REQUEST_LATENCY
+            started = True
+            break
+        if not started:
+            upcoming = backend.next_arrival(t)
+            if upcoming is None:
+                break
+            # Token baru terlihat pada polling berikutnya (rata-rata setengah interval)
+            t = max(t, upcoming + SIM_POLL_INTERVAL / 2)
+    return backend.result(t)
+
+
+def _simulate_queue(customers, max_age):
+    """Jalur trigger_transaction/preload/invoice_queue_loop dengan InvoiceQueue asli dan jam simulasi."""
+    backend = _SimBackend(customers, max_age)
+    queue = InvoiceQueue(max_age=max_age)
+    by_token = {c["token"]: c for c in customers}
+
+    def refresh(now):
+        for customer in backend.tokens(now):
+            queue.push(customer["token"], customer["created"], now=now)
+        queue.evict(now=now)
+
+    def fetch_invoice(entry, now):
+        if entry.invoice_fresh(now=now):
+            return now
+        now += SIM_REQUEST_LATENCY
+        queue.set_invoice(entry.token, {"isPaid": entry.token in backend.paid}, now=now)
+        return now
+
+    def preload(now):
+        entry = queue.peek(now=now)
+        if entry is not None:
+            fetch_invoice(entry, now)
+
+    t = 0.0
+    while True:
+        if queue.peek(now=t) is None:
+            t += SIM_REQUEST_LATENCY
+            refresh(t)
+
+        started = False
+        entry = queue.peek(now=t)
+        while entry is not None:
+            t = fetch_invoice(entry, t)
+            queue.mark_done(entry.token)
+            if not entry.invoice["isPaid"]:
+                start = t
+                end = backend.transaction(by_token[entry.token], start)
+                # Thread preload saat transaksi dimulai, lalu refresh antrian setiap QUEUE_POLL_INTERVAL
+                preload(start)
+                poll = start + SIM_QUEUE_POLL_INTERVAL
+                while poll < end:
+                    refresh(poll)
+                    preload(poll)
+                    poll += SIM_QUEUE_POLL_INTERVAL
+                t = end + SIM_REQUEST_LATENCY
+                started = True
+                break
+            entry = queue.peek(now=t)
+
+        if not started:
+            upcoming = backend.next_arrival(t)
+            if upcoming is None:
+                break
+            t = max(t, upcoming + SIM_POLL_INTERVAL / 2)
+    return backend.result(t)
+
+
+def simulate(hours=8, seed=1, max_age=config.TOKEN_MAX_AGE, **arrival_options):
+    """Membandingkan loop lama dengan antrian invoice pada kedatangan bergerombol."""
+    customers = generate_arrivals(hours, seed, **arrival_options)
+    results = {
+        "customers": len(customers),
+        "legacy": _simulate_legacy(customers, max_age),
+        "queue": _simulate_queue(customers, max_age),
+    }
+    legacy_tph = results["legacy"]["transactions_per_hour"]
+    queue_tph = results["queue"]["transactions_per_hour"]
+    results["improvement"] = round((queue_tph - legacy_tph) / legacy_tph * 100, 1) if legacy_tph else None
+    results["wait_change"] = round(results["queue"]["mean_wait"] - results["legacy"]["mean_wait"], 1)
+    return results
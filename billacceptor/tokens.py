@@ -0,0 +1,42 @@
+import datetime
+import time
+
+from . import config
+
+CREATED_AT_FORMATS = ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_created_at(value):
+    """Mengubah CreatedAt dari API (ISO 8601, default UTC) ke epoch detik."""
+    for fmt in CREATED_AT_FORMATS:
+        try:
+            created_time = datetime.datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        created_time = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if created_time.tzinfo is None:
+        created_time = created_time.replace(tzinfo=datetime.timezone.utc)
+    return created_time.timestamp()
+
+
+def iter_tokens(response_data, max_age=None, now=None, errors=None):
+    """Menghasilkan (PaymentToken, created) untuk token yang umurnya <= max_age detik.
+
+    Jika `errors` berupa list, entri yang tidak valid dilewati dan error-nya ditambahkan ke list;
+    jika tidak, error langsung dilempar.
+    """
+    max_age = max_age if max_age is not None else config.TOKEN_MAX_AGE
+    now = now if now is not None else time.time()
+    for token_data in response_data.get("data") or []:
+        try:
+            token = token_data["PaymentToken"]
+            created = parse_created_at(token_data["CreatedAt"])
+        except (KeyError, TypeError, ValueError) as e:
+            if errors is None:
+                raise
+            errors.append(e)
+            continue
+        if now - created <= max_age:
+            yield token, created
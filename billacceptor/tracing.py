@@ -0,0 +1,301 @@
+import collections
+import json
+import math
+import os
+import sys
+import threading
+import time
+import timeit
+
+# Konfigurasi tracing
+SERVICE_NAME = "billacceptor"
+SPAN_BUFFER_SIZE = 2048
+PROFILER_INTERVAL = 0.01
+PROFILER_MIN_INTERVAL = 0.001
+PROFILER_MAX_DEPTH = 64
+MAX_DISABLED_OVERHEAD_NS = 1000
+
+# Variabel Global
+enabled = False
+spans = collections.deque(maxlen=SPAN_BUFFER_SIZE)
+span_lock = threading.Lock()
+
+profiler_thread = None
+profiler_stop = threading.Event()
+profiler_interval = PROFILER_INTERVAL
+profiler_samples = collections.Counter()
+profiler_lock = threading.Lock()
+
+
+class Span:
+    """Satu span tracing: nama, ID trace/span, waktu mulai/selesai dan atribut."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id or new_trace_id()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.error = None
+
+    def duration_ms(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "start": self.start_ns,
+            "end": self.end_ns,
+            "durationMs": round(self.duration_ms(), 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self):
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns if self.end_ns is not None else self.start_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Context manager kosong, dipakai saat tracing dimatikan."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.span = Span(name, trace_id, parent_id, attributes)
+
+    def __enter__(self):
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        end_span(self.span, error=repr(exc) if exc is not None else None)
+        return False
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def new_trace_id():
+    """Membuat ID trace baru (32 hex, format OTLP)."""
+    return os.urandom(16).hex()
+
+
+def start_span(name, trace_id, parent=None, **attributes):
+    """Memulai span. Mengembalikan None jika tracing dimatikan."""
+    if not enabled:
+        return None
+    parent_id = parent.span_id if parent is not None else None
+    return Span(name, trace_id, parent_id, attributes)
+
+
+def end_span(span, error=None, **attributes):
+    """Menutup span dan menyimpannya ke ring buffer."""
+    if span is None or span.end_ns is not None:
+        return
+    span.end_ns = time.time_ns()
+    span.error = error
+    if attributes:
+        span.attributes.update(attributes)
+    with span_lock:
+        spans.append(span)
+
+
+def span(name, trace_id, parent=None, **attributes):
+    """Context manager untuk span; tanpa overhead berarti saat tracing dimatikan."""
+    if not enabled:
+        return _NOOP_SPAN
+    parent_id = parent.span_id if parent is not None else None
+    return _SpanContext(name, trace_id, parent_id, attributes)
+
+
+def set_enabled(value):
+    global enabled
+    enabled = bool(value)
+
+
+def get_spans(trace_id=None):
+    with span_lock:
+        snapshot = list(spans)
+    if trace_id:
+        snapshot = [s for s in snapshot if s.trace_id == trace_id]
+    return snapshot
+
+
+def clear_spans():
+    with span_lock:
+        spans.clear()
+
+
+def to_otlp_json(snapshot=None):
+    """Mengubah span ke format OTLP/JSON (ExportTraceServiceRequest)."""
+    if snapshot is None:
+        snapshot = get_spans()
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": SERVICE_NAME},
+                "spans": [s.to_otlp() for s in snapshot],
+            }],
+        }]
+    }
+
+
+def export_otlp(directory, trace_id=None):
+    """Menulis span ke file JSON OTLP di direktori, mengembalikan path file."""
+    os.makedirs(directory, exist_ok=True)
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = f"-{trace_id}" if trace_id else ""
+    path = os.path.join(directory, f"traces-{timestamp}{suffix}.json")
+    with open(path, "w") as f:
+        json.dump(to_otlp_json(get_spans(trace_id)), f)
+    return path
+
+
+# Profiler sampling
+def _profiler_loop():
+    own_ident = threading.get_ident()
+    while not profiler_stop.wait(profiler_interval):
+        frames = sys._current_frames()
+        stacks = []
+        for ident, frame in frames.items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stacks.append(";".join(reversed(stack)))
+        with profiler_lock:
+            profiler_samples.update(stacks)
+
+
+def parse_profiler_interval(interval):
+    """Validasi interval sampling; ValueError jika bukan angka, minimal PROFILER_MIN_INTERVAL."""
+    if isinstance(interval, bool):
+        raise ValueError(f"{interval!r} bukan angka")
+    try:
+        interval = float(interval)
+    except (TypeError, ValueError):
+        raise ValueError(f"{interval!r} bukan angka") from None
+    if not math.isfinite(interval):
+        raise ValueError(f"{interval!r} bukan angka berhingga")
+    return max(interval, PROFILER_MIN_INTERVAL)
+
+
+def start_profiler(interval=None):
+    """Menjalankan profiler sampling di thread terpisah."""
+    global profiler_thread, profiler_interval
+    if interval is not None:
+        interval = parse_profiler_interval(interval)
+    if profiler_thread is not None and profiler_thread.is_alive():
+        return False
+    if interval is not None:
+        profiler_interval = interval
+    profiler_stop.clear()
+    profiler_thread = threading.Thread(target=_profiler_loop, daemon=True)
+    profiler_thread.start()
+    return True
+
+
+def stop_profiler():
+    global profiler_thread
+    if profiler_thread is None:
+        return False
+    profiler_stop.set()
+    profiler_thread.join(timeout=1)
+    profiler_thread = None
+    return True
+
+
+def profiler_running():
+    return profiler_thread is not None and profiler_thread.is_alive()
+
+
+def get_profile(reset=False):
+    """Mengembalikan sampel profiler dalam format folded stack."""
+    with profiler_lock:
+        samples = dict(profiler_samples)
+        if reset:
+            profiler_samples.clear()
+    return samples
+
+
+def folded_profile():
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(get_profile().items()))
+
+
+def bench(number=200000):
+    """Benchmark overhead tracing saat dimatikan dibandingkan tanpa instrumentasi."""
+    global enabled
+    previous = enabled
+
+    def baseline():
+        pass
+
+    def disabled_span():
+        with span("bench", None):
+            pass
+
+    def disabled_start_end():
+        end_span(start_span("bench", None))
+
+    def enabled_span():
+        with span("bench", None):
+            pass
+
+    results = {}
+    try:
+        enabled = False
+        results["baseline"] = min(timeit.repeat(baseline, number=number, repeat=5))
+        results["disabled_span"] = min(timeit.repeat(disabled_span, number=number, repeat=5))
+        results["disabled_start_end"] = min(timeit.repeat(disabled_start_end, number=number, repeat=5))
+        enabled = True
+        results["enabled_span"] = min(timeit.repeat(enabled_span, number=number // 10, repeat=3)) * 10
+    finally:
+        enabled = previous
+        clear_spans()
+
+    per_call = {k: v / number * 1e9 for k, v in results.items()}
+    for key, value in per_call.items():
+        print(f"{key:20s} {value:8.1f} ns/op")
+    overhead = per_call["disabled_span"] - per_call["baseline"]
+    print(f"Overhead saat dimatikan: {overhead:.1f} ns/op")
+    return per_call
+
@@ -0,0 +1,54 @@
+import time
+
+from . import api, tokens
+from .logger import console
+
+
+def fetch_invoice_data():
+    """Mengambil data invoice dari API."""
+    try:
+        response = api.get_tokens(timeout=5)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            console(f"⚠ Gagal mengambil data invoice: {response.status_code}")
+    except api.RequestException as e:
+        console(f"⚠ Error saat request: {e}")
+    return None
+
+def get_valid_payment_token(data):
+    """Mendapatkan PaymentToken terbaru yang usianya kurang dari 3 menit."""
+    errors = []
+    for token, _ in tokens.iter_tokens(data, errors=errors):
+        return token
+    for error in errors:
+        console(f"⚠ Data token tidak valid, dilewati: {error!r}")
+
+    return None
+
+def main_loop(interval=1, wait=None):
+    """Loop utama yang berjalan setiap `interval` detik.
+
+    `wait(interval)` dipakai untuk menunggu jika diberikan, sehingga loop bisa dibangunkan lebih awal
+    oleh event (mode hemat daya di `billacceptor run`).
+    """
+    while True:
+        json_response = fetch_invoice_data()
+        
+        if json_response:
+            try:
+                valid_token = get_valid_payment_token(json_response)
+            except (AttributeError, TypeError) as e:
+                console(f"⚠ Format respon token tidak valid: {e!r}")
+                valid_token = None
+            else:
+                if valid_token:
+                    console(f"✅ Payment Token valid ditemukan: {valid_token}")
+                else:
+                    console("🚫 Tidak ada transaksi valid (<3 menit)")
+        
+        # Tunggu sebelum request ulang
+        if wait is not None:
+            wait(interval)
+        else:
+            time.sleep(interval)
@@ -0,0 +1,25 @@
+import pytest
+
+from billacceptor import config, decoder
+
+
+@pytest.mark.parametrize("pulses, nearest, tolerance", [
+    (1, 1, 0),
+    (3, 2, 0),
+    (4, 2, 0),
+    (6, 5, 1),
+    (12, 10, 2),
+    (47, 50, 3),
+])
+def test_required_tolerance_follows_decoder_rules(pulses, nearest, tolerance):
+    assert decoder.nearest_valid_pulse(pulses) == nearest
+    assert decoder.required_tolerance(pulses) == tolerance
+
+
+def test_closest_valid_pulse_applies_tolerance(monkeypatch):
+    monkeypatch.setattr(config, "TOLERANCE", 2)
+    assert decoder.closest_valid_pulse(4) == 2
+    assert decoder.closest_valid_pulse(12) == 10
+    assert decoder.closest_valid_pulse(47) is None
+    monkeypatch.setattr(config, "TOLERANCE", 3)
+    assert decoder.closest_valid_pulse(47) == 50
@@ -0,0 +1,165 @@
+import time
+
+import pytest
+
+from billacceptor import api, config, device, invoicequeue, tracing
+
+
+class StubResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class StubApi:
+    RequestException = api.RequestException
+
+    def __init__(self, invoice_statuses):
+        self.invoice_statuses = list(invoice_statuses)
+        self.invoice_calls = 0
+
+    def get_tokens(self, timeout=1):
+        created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return StubResponse(200, {"data": [{"PaymentToken": "tok-1", "CreatedAt": created}]})
+
+    def get_invoice(self, token, timeout=5):
+        self.invoice_calls += 1
+        if self.invoice_statuses.pop(0) != 200:
+            return StubResponse(500, {"error": "Internal Server Error"})
+        return StubResponse(200, {"data": {"ID": 7, "paymentToken": token, "productPrice": "5000", "isPaid": False}})
+
+
+class StubPi:
+    def write(self, gpio, level):
+        pass
+
+
+@pytest.fixture
+def stub_device(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "LOG_FILE", str(tmp_path / "log.txt"))
+    monkeypatch.setattr(config, "VERBOSE", False)
+    monkeypatch.setattr(invoicequeue, "INVOICE_RETRY_DELAY", 0.05)
+    monkeypatch.setattr(device, "idle_poll_interval", lambda: 0.1)
+    monkeypatch.setattr(device, "invoice_queue", invoicequeue.InvoiceQueue())
+    monkeypatch.setattr(device, "pi", StubPi())
+    monkeypatch.setattr(device, "start_timeout_timer", lambda: None)
+    for name in ("transaction_active", "id_trx", "payment_token", "product_price", "pending_pulse_count",
+                 "last_pulse_received_time", "trace_id", "transaction_span"):
+        monkeypatch.setattr(device, name, getattr(device, name))
+    return monkeypatch
+
+
+def test_invoice_server_error_keeps_token_queued_and_retries(stub_device):
+    stub_api = StubApi([500, 200])
+    stub_device.setattr(device, "api", stub_api)
+    stub_device.setattr(device, "preload_next_invoice", lambda: None)
+
+    device.trigger_transaction()
+
+    assert stub_api.invoice_calls == 2
+    assert device.transaction_active
+    assert device.id_trx == 7
+    assert device.product_price == 5000
+    assert "tok-1" in device.invoice_queue.done
+
+
+def test_preload_failure_does_not_mark_token_done(stub_device):
+    stub_api = StubApi([500])
+    stub_device.setattr(device, "api", stub_api)
+    device.invoice_queue.push("tok-1", time.time())
+
+    device.preload_next_invoice()
+
+    assert stub_api.invoice_calls == 1
+    assert "tok-1" not in device.invoice_queue.done
+    assert device.invoice_queue.peek().token == "tok-1"
+
+
+class FailingApi:
+    RequestException = api.RequestException
+
+    def get_tokens(self, timeout=1):
+        raise api.RequestException("timeout")
+
+
+def test_refresh_records_failed_and_non_empty_polls_only(stub_device):
+    stub_device.setattr(tracing, "enabled", True)
+    tracing.clear_spans()
+    trace = tracing.new_trace_id()
+
+    stub_device.setattr(device, "api", FailingApi())
+    with pytest.raises(api.RequestException):
+        device.refresh_invoice_queue(trace)
+
+    stub_device.setattr(device, "api", StubApi([]))
+    device.refresh_invoice_queue(trace)
+    # Token yang sudah ada di antrian tetap tercatat sebagai polling yang mengembalikan data
+    assert device.refresh_invoice_queue(trace) == 0
+
+    stub_device.setattr(StubApi, "get_tokens", lambda self, timeout=1: StubResponse(200, {"data": []}))
+    device.refresh_invoice_queue(trace)
+
+    spans = tracing.get_spans(trace)
+    tracing.clear_spans()
+    assert [span.name for span in spans] == ["token.poll"] * 3
+    assert "timeout" in spans[0].error
+    assert spans[1].attributes == {"status_code": 200, "tokens": 1, "queued": 1}
+    assert spans[2].attributes == {"status_code": 200, "tokens": 1, "queued": 0}
+
+
+def test_idle_loop_skips_trace_id_when_tracing_disabled(stub_device):
+    stub_device.setattr(tracing, "enabled", False)
+    stub_device.setattr(tracing, "new_trace_id", lambda: pytest.fail("new_trace_id dipanggil"))
+    stub_device.setattr(device, "api", StubApi([200]))
+    stub_device.setattr(device, "preload_next_invoice", lambda: None)
+
+    device.trigger_transaction()
+
+    assert device.trace_id is None
+    assert device.transaction_active
+
+
+def test_calibrate_apply_rejected_during_transaction(stub_device):
+    stub_device.setattr(device, "transaction_active", True)
+    stub_device.setattr(config, "TOLERANCE", 2)
+
+    response = device.app.test_client().post("/api/debug/pulses/calibrate", json={"apply": True})
+
+    assert response.status_code == 409
+    assert config.TOLERANCE == 2
+
+
+def test_applied_calibration_is_saved_per_device_and_loaded(stub_device, tmp_path):
+    stub_device.setattr(config, "ID_DEVICE", "bic42")
+    for name in ("DEBOUNCE_TIME", "TOLERANCE", "SETTLE_TIME"):
+        stub_device.setattr(config, name, getattr(config, name))
+
+    device.apply_calibration({"debounce_time": 0.03, "tolerance": 3, "settle_time": 0.5})
+    assert (tmp_path / "calibration-bic42.json").exists()
+
+    config.DEBOUNCE_TIME, config.TOLERANCE, config.SETTLE_TIME = 0.05, 2, 2
+    assert device.load_calibration() == {"debounce_time": 0.03, "tolerance": 3, "settle_time": 0.5}
+    assert (config.DEBOUNCE_TIME, config.TOLERANCE, config.SETTLE_TIME) == (0.03, 3, 0.5)
+
+    stub_device.setattr(config, "ID_DEVICE", "bic43")
+    assert device.load_calibration() == {}
+
+
+def test_watcher_not_started_when_console_output_is_suppressed(stub_device):
+    started = []
+    stub_device.setattr(config, "VERBOSE", False)
+    stub_device.setattr(device.threading, "Thread", lambda target, args=(), daemon=None: started.append(target) or StubThread())
+
+    device.start_threads(watch_tokens=True)
+
+    assert [target.__name__ for target in started] == ["calibration_loop", "invoice_queue_loop", "trigger_transaction"]
+
+
+class StubThread:
+    def start(self):
+        pass
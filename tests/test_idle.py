@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from billacceptor import idle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.cpu = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def process_time(self):
+        return self.cpu
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(idle.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(idle.time, "process_time", clock.process_time)
+    return clock
+
+
+def test_wait_counts_only_wakeups_while_idle(clock):
+    monitor = idle.IdleMonitor()
+    fired = threading.Event()
+    fired.set()
+
+    monitor.wait(fired, 0, "gpio")
+    monitor.set_idle(True)
+    monitor.wait(fired, 0, "token")
+    monitor.wait(threading.Event(), 0, "token")
+    monitor.set_idle(False)
+    monitor.wait(threading.Event(), 0, "gpio")
+
+    assert monitor.report()["wakeups"] == {"token": 1, "token_deadline": 1}
+
+
+def test_report_per_idle_minute_and_cpu_per_idle_hour(clock):
+    monitor = idle.IdleMonitor()
+    clock.now = 100.0
+    monitor.set_idle(True)
+    for _ in range(6):
+        monitor.wait(threading.Event(), 0, "token")
+    clock.now = 160.0
+    clock.cpu = 0.5
+    monitor.set_idle(False)
+    clock.now = 1000.0
+
+    report = monitor.report()
+    assert report["uptime_seconds"] == 1000.0
+    assert report["idle_seconds"] == 60.0
+    assert report["wakeups_per_minute"] == 6
+    assert report["cpu_seconds_per_idle_hour"] == 30.0
+
+
+def test_report_includes_periodic_wakeups(clock):
+    monitor = idle.IdleMonitor()
+    monitor.set_periodic("http_server", 15)
+    monitor.set_periodic("calibration", 300)
+    monitor.set_periodic("removed", 1)
+    monitor.set_periodic("removed", None)
+    monitor.set_idle(True)
+    clock.now = 120.0
+
+    report = monitor.report()
+    assert report["periodic"] == {"http_server": 15, "calibration": 300}
+    assert report["wakeups_per_minute"] == 4.2
+
+
+def test_report_without_idle_time(clock):
+    report = idle.IdleMonitor().report()
+    assert report["wakeups_per_minute"] == 0
+    assert report["cpu_seconds_per_idle_hour"] == 0
@@ -0,0 +1,82 @@
+from billacceptor import invoicequeue
+from billacceptor.invoicequeue import InvoiceQueue
+
+NOW = 1_000_000.0
+
+
+def test_push_deduplicates_and_rejects_expired_tokens():
+    queue = InvoiceQueue(max_age=180)
+
+    assert queue.push("a", NOW - 10, now=NOW)
+    assert not queue.push("a", NOW - 10, now=NOW)
+    assert not queue.push("old", NOW - 181, now=NOW)
+    assert len(queue) == 1
+
+
+def test_peek_returns_oldest_token_first():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("newer", NOW - 5, now=NOW)
+    queue.push("oldest", NOW - 60, now=NOW)
+    queue.push("middle", NOW - 30, now=NOW)
+
+    order = []
+    while queue.peek(now=NOW) is not None:
+        entry = queue.peek(now=NOW)
+        order.append(entry.token)
+        queue.mark_done(entry.token)
+    assert order == ["oldest", "middle", "newer"]
+
+
+def test_peek_skips_tokens_that_expired_while_queued():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("a", NOW - 170, now=NOW)
+    queue.push("b", NOW - 10, now=NOW)
+
+    assert queue.peek(now=NOW + 20).token == "b"
+    assert len(queue) == 1
+
+
+def test_mark_done_blocks_requeue_until_token_expires():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("a", NOW - 10, now=NOW)
+    queue.mark_done("a")
+
+    assert queue.peek(now=NOW) is None
+    assert not queue.push("a", NOW - 10, now=NOW)
+
+    queue.evict(now=NOW + 171)
+    assert "a" not in queue.done
+
+
+def test_evict_returns_expired_tokens():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("a", NOW - 170, now=NOW)
+    queue.push("b", NOW - 10, now=NOW)
+
+    assert queue.evict(now=NOW + 20) == ["a"]
+    assert [entry["paymentToken"] for entry in queue.snapshot(now=NOW + 20)] == ["b"]
+
+
+def test_set_invoice_marks_entry_preloaded_until_stale():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("a", NOW - 10, now=NOW)
+
+    assert queue.set_invoice("a", {"ID": 1}, now=NOW)
+    entry = queue.peek(now=NOW)
+    assert entry.invoice_fresh(now=NOW + invoicequeue.INVOICE_PRELOAD_MAX_AGE)
+    assert not entry.invoice_fresh(now=NOW + invoicequeue.INVOICE_PRELOAD_MAX_AGE + 1)
+    assert not queue.set_invoice("missing", {}, now=NOW)
+
+
+def test_defer_skips_token_until_retry_delay_passes():
+    queue = InvoiceQueue(max_age=180)
+    queue.push("a", NOW - 30, now=NOW)
+    queue.push("b", NOW - 10, now=NOW)
+
+    assert queue.defer("a", delay=5, now=NOW)
+    assert queue.peek(now=NOW).token == "b"
+    queue.mark_done("b")
+    assert queue.peek(now=NOW + 1) is None
+    assert queue.peek(now=NOW + 5).token == "a"
+    assert not queue.push("a", NOW - 30, now=NOW + 5)
+    assert not queue.defer("missing")
@@ -0,0 +1,145 @@
+import pytest
+
+from billacceptor import pulsecapture
+from billacceptor.pulsecapture import BurstRing, PulseCapture, tick_diff
+
+PULSE_MAPPING = {1: 1000, 2: 2000, 5: 5000, 10: 10000, 20: 20000, 50: 50000, 100: 100000}
+
+
+def feed_burst(capture, start, pulses, gap_us=100000, width_us=50000, corrected=None):
+    """Mensimulasikan satu burst: falling lalu rising per pulsa, berjarak gap_us."""
+    tick = start
+    for _ in range(pulses):
+        capture.falling(tick)
+        tick = (tick + width_us) & 0xFFFFFFFF
+        capture.rising(tick)
+        tick = (tick + gap_us - width_us) & 0xFFFFFFFF
+    capture.finish(pulses, pulses if corrected is None else corrected)
+    return tick
+
+
+def test_tick_diff_wraps_32_bit():
+    assert tick_diff(0xFFFFFFF0, 0x10) == 0x20
+    assert tick_diff(100, 250) == 150
+
+
+def test_burst_ring_wraps_oldest_first():
+    ring = BurstRing(size=3)
+    for pulses in range(1, 6):
+        ring.append(pulses=pulses)
+
+    assert len(ring) == 3
+    assert [r["pulses"] for r in ring.records()] == [3, 4, 5]
+
+
+def test_burst_ring_clamps_to_column_type():
+    ring = BurstRing(size=2)
+    ring.append(pulses=70000, min_gap_us=-5)
+
+    record = ring.records()[0]
+    assert record["pulses"] == 0xFFFF
+    assert record["min_gap_us"] == 0
+
+
+def test_burst_ring_clear():
+    ring = BurstRing(size=2)
+    ring.append(pulses=1)
+    ring.clear()
+    assert ring.records() == []
+
+
+def test_capture_records_gaps_and_widths_across_tick_wrap():
+    capture = PulseCapture(PULSE_MAPPING)
+    feed_burst(capture, 0xFFFFFFFF - 120000, 5)
+
+    record = capture.records()[0]
+    assert record["raw_pulses"] == 5
+    assert record["corrected_pulses"] == 5
+    assert record["min_gap_us"] == record["max_gap_us"] == 100000
+    assert record["mean_width_us"] == 50000
+    assert record["duration_us"] == 400000
+
+
+def test_finish_without_pulses_records_nothing():
+    capture = PulseCapture(PULSE_MAPPING)
+    capture.finish(0, None)
+    assert capture.records() == []
+
+
+def test_analyze_needs_minimum_samples():
+    capture = PulseCapture(PULSE_MAPPING)
+    feed_burst(capture, 0, 10)
+
+    suggested = capture.analyze(0.05, 2, 2)["suggested"]
+    assert suggested == {"debounce_time": None, "tolerance": None, "settle_time": None}
+
+
+def test_analyze_clean_bursts():
+    capture = PulseCapture(PULSE_MAPPING)
+    tick = 0
+    for _ in range(pulsecapture.CALIBRATION_MIN_SAMPLES):
+        tick = feed_burst(capture, tick, 10)
+
+    analysis = capture.analyze(0.05, 2, 2)
+    assert analysis["samples"] == pulsecapture.CALIBRATION_MIN_SAMPLES
+    assert analysis["invalid"] == 0
+    assert analysis["histograms"]["10000"]["pulses"] == {10: pulsecapture.CALIBRATION_MIN_SAMPLES}
+    assert analysis["histograms"]["10000"]["mean_gap_ms"] == {100: pulsecapture.CALIBRATION_MIN_SAMPLES}
+    # Jarak pulsa 100 ms -> debounce setengahnya, settle 3x jarak terpanjang (min 0.3 s)
+    assert analysis["suggested"]["debounce_time"] == 0.05
+    assert analysis["suggested"]["settle_time"] == 0.3
+    # Data bersih tidak menurunkan toleransi di bawah nilai saat ini
+    assert analysis["suggested"]["tolerance"] == 2
+    assert analysis["current"] == {"debounce_time": 0.05, "tolerance": 2, "settle_time": 2}
+
+
+def test_analyze_counts_invalid_bursts_separately():
+    capture = PulseCapture(PULSE_MAPPING)
+    tick = feed_burst(capture, 0, 10)
+    feed_burst(capture, tick, 14, corrected=0)
+
+    analysis = capture.analyze(0.05, 2, 2)
+    assert analysis["valid"] == 1
+    assert analysis["invalid"] == 1
+    assert analysis["histograms"]["invalid"]["pulses"] == {14: 1}
+
+
+def test_analyze_uses_decoder_deviation_and_keeps_rare_outliers():
+    capture = PulseCapture(PULSE_MAPPING)
+    tick = 0
+    for _ in range(pulsecapture.CALIBRATION_MIN_SAMPLES):
+        # Decoder mengkreditkan 4 pulsa sebagai 2 tanpa toleransi, jadi deviasinya 0
+        tick = feed_burst(capture, tick, 4, corrected=2)
+    assert capture.analyze(0.05, 1, 2)["suggested"]["tolerance"] == 1
+
+    feed_burst(capture, tick, 12, corrected=0)
+    assert capture.analyze(0.05, 1, 2)["suggested"]["tolerance"] == 2
+
+
+def test_suggest_tolerance_covers_largest_deviation_and_caps():
+    samples = pulsecapture.CALIBRATION_MIN_SAMPLES
+    assert pulsecapture._suggest_tolerance([0] * (samples - 1) + [3] * 1) == 3
+    assert pulsecapture._suggest_tolerance([0] * samples) == 1
+    assert pulsecapture._suggest_tolerance([0] * samples, current=2) == 2
+    assert pulsecapture._suggest_tolerance([1] * samples, current=3) == 3
+    assert pulsecapture._suggest_tolerance([9] * samples) == pulsecapture.MAX_TOLERANCE
+
+
+def test_suggest_debounce_stays_above_glitches_and_below_valid_gaps():
+    samples = pulsecapture.CALIBRATION_MIN_SAMPLES
+    clean = [100000] * samples
+
+    assert pulsecapture._suggest_debounce(clean, []) == 0.05
+    # Glitch 60 ms -> 72 ms, masih di bawah 90% jarak valid
+    assert pulsecapture._suggest_debounce(clean, [60000]) == 0.072
+    # Glitch terlalu dekat dengan jarak valid -> dibatasi 90% jarak valid
+    assert pulsecapture._suggest_debounce(clean, [95000]) == 0.09
+
+
+@pytest.mark.parametrize("max_gap_us, expected", [
+    (50000, pulsecapture.MIN_SETTLE_TIME),
+    (200000, 0.6),
+    (2000000, pulsecapture.MAX_SETTLE_TIME),
+])
+def test_suggest_settle_is_clamped(max_gap_us, expected):
+    assert pulsecapture._suggest_settle([max_gap_us] * pulsecapture.CALIBRATION_MIN_SAMPLES) == expected
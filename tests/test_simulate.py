@@ -0,0 +1,55 @@
+from billacceptor import simulate
+
+
+def customer(token, created, service=30.0, abandons=False):
+    return {"token": token, "created": created, "service": service, "abandons": abandons}
+
+
+def test_single_customer_waits_the_same_for_both_policies():
+    customers = [customer("c0", 100.0)]
+
+    legacy = simulate._simulate_legacy(customers, 180)
+    queue = simulate._simulate_queue(customers, 180)
+    assert legacy["served"] == queue["served"] == 1
+    assert legacy["mean_wait"] == queue["mean_wait"]
+
+
+def test_queue_policy_drives_invoice_queue_oldest_first(monkeypatch):
+    pushed = []
+    done = []
+    real_push = simulate.InvoiceQueue.push
+    real_mark_done = simulate.InvoiceQueue.mark_done
+
+    def push(self, token, created, now=None):
+        accepted = real_push(self, token, created, now=now)
+        if accepted:
+            pushed.append(token)
+        return accepted
+
+    def mark_done(self, token):
+        done.append(token)
+        real_mark_done(self, token)
+
+    monkeypatch.setattr(simulate.InvoiceQueue, "push", push)
+    monkeypatch.setattr(simulate.InvoiceQueue, "mark_done", mark_done)
+    customers = [customer("c0", 0.0, service=60.0), customer("c1", 11.0), customer("c2", 12.0)]
+
+    assert simulate._simulate_queue(customers, 180)["served"] == 3
+    # API mengembalikan token terbaru dulu, antrian tetap melayani yang tertua
+    assert pushed == ["c0", "c2", "c1"]
+    assert done == ["c0", "c1", "c2"]
+
+
+def test_queue_does_not_restart_abandoned_token():
+    customers = [customer("gone", 0.0, abandons=True), customer("c1", 5.0)]
+
+    legacy = simulate._simulate_legacy(customers, 180)
+    queue = simulate._simulate_queue(customers, 180)
+    assert queue["served"] == legacy["served"] == 1
+    assert queue["mean_wait"] <= legacy["mean_wait"]
+
+
+def test_simulation_is_deterministic_per_seed():
+    result = simulate.simulate(hours=1, seed=7)
+    assert result == simulate.simulate(hours=1, seed=7)
+    assert result["wait_change"] == round(result["queue"]["mean_wait"] - result["legacy"]["mean_wait"], 1)
@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+
+from billacceptor import tokens
+
+NOW = datetime.datetime(2026, 10, 19, 3, 1, tzinfo=datetime.timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("value", [
+    "2026-10-19T03:00:00Z",
+    "2026-10-19T03:00:00.000Z",
+    "2026-10-19T03:00:00.000000Z",
+    "2026-10-19T10:00:00+07:00",
+])
+def test_parse_created_at_accepts_api_timestamp_variants(value):
+    assert tokens.parse_created_at(value) == NOW - 60
+
+
+def test_iter_tokens_filters_by_age():
+    data = {"data": [
+        {"PaymentToken": "fresh", "CreatedAt": "2026-10-19T03:00:00Z"},
+        {"PaymentToken": "old", "CreatedAt": "2026-10-19T02:00:00Z"},
+    ]}
+
+    assert [token for token, _ in tokens.iter_tokens(data, max_age=180, now=NOW)] == ["fresh"]
+
+
+def test_iter_tokens_collects_invalid_entries_when_errors_given():
+    data = {"data": [
+        {"CreatedAt": "2026-10-19T03:00:00Z"},
+        {"PaymentToken": "bad", "CreatedAt": "kemarin"},
+        {"PaymentToken": "fresh", "CreatedAt": "2026-10-19T03:00:00Z"},
+    ]}
+    errors = []
+
+    assert [token for token, _ in tokens.iter_tokens(data, max_age=180, now=NOW, errors=errors)] == ["fresh"]
+    assert len(errors) == 2
+
+
+def test_iter_tokens_raises_without_errors_list():
+    with pytest.raises(ValueError):
+        list(tokens.iter_tokens({"data": [{"PaymentToken": "bad", "CreatedAt": "kemarin"}]}, now=NOW))
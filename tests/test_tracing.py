@@ -0,0 +1,120 @@
+import json
+import math
+
+import pytest
+
+from billacceptor import tracing
+
+
+@pytest.fixture(autouse=True)
+def clean_tracing():
+    previous = tracing.enabled
+    tracing.clear_spans()
+    yield
+    tracing.set_enabled(previous)
+    tracing.clear_spans()
+
+
+def test_start_and_end_span_link_trace_and_parent():
+    tracing.set_enabled(True)
+    trace_id = tracing.new_trace_id()
+
+    parent = tracing.start_span("transaction", trace_id, id_trx=1)
+    child = tracing.start_span("pulse.burst", trace_id, parent)
+    tracing.end_span(child, pulses=5)
+    tracing.end_span(parent)
+    tracing.end_span(parent)
+
+    spans = tracing.get_spans(trace_id)
+    assert [span.name for span in spans] == ["pulse.burst", "transaction"]
+    assert len(trace_id) == 32
+    assert child.trace_id == parent.trace_id == trace_id
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert child.attributes == {"pulses": 5}
+    assert child.end_ns >= child.start_ns
+
+
+def test_span_context_records_error():
+    tracing.set_enabled(True)
+
+    with pytest.raises(RuntimeError):
+        with tracing.span("invoice.get", None):
+            raise RuntimeError("gagal")
+
+    [span] = tracing.get_spans()
+    assert "gagal" in span.error
+    assert len(span.trace_id) == 32
+
+
+def test_disabled_tracing_is_noop():
+    tracing.set_enabled(False)
+
+    assert tracing.start_span("token.poll", None) is None
+    tracing.end_span(None)
+    with tracing.span("invoice.get", None) as span:
+        assert span is None
+    assert tracing.span("invoice.get", None) is tracing._NOOP_SPAN
+    assert tracing.get_spans() == []
+
+
+def test_to_otlp_json_structure_and_attribute_types():
+    tracing.set_enabled(True)
+    trace_id = tracing.new_trace_id()
+    root = tracing.start_span("transaction", trace_id, paid=True, amount=5000, ratio=0.5, token="abc")
+    child = tracing.start_span("transaction.submit", trace_id, root)
+    tracing.end_span(child, error="timeout")
+    tracing.end_span(root)
+
+    payload = tracing.to_otlp_json()
+    [resource_spans] = payload["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": tracing.SERVICE_NAME}}
+    ]
+    [scope_spans] = resource_spans["scopeSpans"]
+    assert scope_spans["scope"] == {"name": tracing.SERVICE_NAME}
+    child_otlp, root_otlp = scope_spans["spans"]
+
+    assert "parentSpanId" not in root_otlp
+    assert child_otlp["parentSpanId"] == root_otlp["spanId"]
+    assert root_otlp["status"] == {"code": 1}
+    assert child_otlp["status"] == {"code": 2, "message": "timeout"}
+    assert isinstance(root_otlp["startTimeUnixNano"], str)
+    assert {a["key"]: a["value"] for a in root_otlp["attributes"]} == {
+        "paid": {"boolValue": True},
+        "amount": {"intValue": "5000"},
+        "ratio": {"doubleValue": 0.5},
+        "token": {"stringValue": "abc"},
+    }
+
+
+def test_export_otlp_writes_json_file(tmp_path):
+    tracing.set_enabled(True)
+    trace_id = tracing.new_trace_id()
+    tracing.end_span(tracing.start_span("transaction", trace_id))
+    tracing.end_span(tracing.start_span("token.poll", tracing.new_trace_id()))
+
+    path = tracing.export_otlp(str(tmp_path / "traces"), trace_id)
+
+    assert path.startswith(str(tmp_path / "traces"))
+    assert path.endswith(f"-{trace_id}.json")
+    with open(path) as f:
+        payload = json.load(f)
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["transaction"]
+
+
+@pytest.mark.parametrize("value", [True, False, math.nan, "nan", math.inf, "cepat", None, [0.1]])
+def test_parse_profiler_interval_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        tracing.parse_profiler_interval(value)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0.05, 0.05),
+    ("0.02", 0.02),
+    (0, tracing.PROFILER_MIN_INTERVAL),
+    (-1, tracing.PROFILER_MIN_INTERVAL),
+])
+def test_parse_profiler_interval_clamps_to_minimum(value, expected):
+    assert tracing.parse_profiler_interval(value) == expected